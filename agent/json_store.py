@@ -0,0 +1,26 @@
+"""Atomic JSON persistence shared by the on-disk caches."""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+
+def load_json(path: Path) -> Optional[Any]:
+    """Return the JSON stored at path, or None if it is missing or unreadable."""
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def save_json(path: Path, data: Any):
+    """Write data to path atomically, so a crash never leaves half a file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
@@ -0,0 +1,148 @@
+"""Warm-up and keep-alive manager for the Ollama models used by the daemon."""
+
+import asyncio
+import logging
+import time
+from typing import Optional, Dict, Any, Tuple, Union
+
+from .ollama_pool import OllamaEndpointPool, OllamaEndpoint
+
+logger = logging.getLogger(__name__)
+
+
+class ModelManager:
+    """Keep the daemon's Ollama models resident and track their load state.
+    
+    Models are warmed at startup with the configured keep_alive and pinged
+    periodically so Ollama doesn't unload them between requests. Each ping
+    also checks which models are loaded, which is how evictions (another
+    model being swapped in) and cold starts are counted. Every endpoint in
+    the pool loads its own copy, so state is tracked per endpoint.
+    """
+    
+    # A warm-up that spends longer than this loading counts as a cold start
+    COLD_LOAD_SECONDS = 0.5
+    
+    def __init__(
+        self,
+        base_url: str = "http://localhost:11434",
+        models: Optional[Dict[str, str]] = None,
+        keep_alive: Union[str, float] = "30m",
+        ping_interval: float = 120.0,
+        timeout: float = 120.0,
+        pool: Optional[OllamaEndpointPool] = None
+    ):
+        self._owns_pool = pool is None
+        self.pool = pool or OllamaEndpointPool([base_url], timeout=timeout)
+        # model name -> "generate" or "embed"
+        self.models = dict(models or {})
+        self.keep_alive = keep_alive
+        self.ping_interval = ping_interval
+        
+        self.state: Dict[Tuple[str, str], Dict[str, Any]] = {
+            (endpoint.url, name): {
+                "kind": kind,
+                "state": "unknown",
+                "cold_starts": 0,
+                "evictions": 0,
+                "last_load_seconds": None,
+                "last_seen_loaded": None,
+                "size_vram": None
+            }
+            for endpoint in self.pool.endpoints
+            for name, kind in self.models.items()
+        }
+        self._task: Optional[asyncio.Task] = None
+    
+    async def start(self):
+        """Warm all models in the background and start the keep-alive loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop pinging and close the endpoint pool if the manager owns it."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._owns_pool:
+            await self.pool.close()
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return per model how many endpoints are in each load state, and counters summed over endpoints."""
+        models: Dict[str, Dict[str, Any]] = {}
+        for (_, name), info in self.state.items():
+            model = models.setdefault(name, {"states": {}, "cold_starts": 0, "evictions": 0})
+            model["states"][info["state"]] = model["states"].get(info["state"], 0) + 1
+            model["cold_starts"] += info["cold_starts"]
+            model["evictions"] += info["evictions"]
+        return models
+    
+    async def _run(self):
+        for endpoint in self.pool.endpoints:
+            for name in self.models:
+                await self.warm(endpoint, name)
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            await self.refresh()
+    
+    async def warm(self, endpoint: OllamaEndpoint, name: str) -> bool:
+        """Load a model on an endpoint (or extend its keep_alive) and record the load time."""
+        info = self.state[(endpoint.url, name)]
+        if info["state"] != "loaded":
+            info["state"] = "loading"
+        try:
+            if info["kind"] == "embed":
+                response = await endpoint.client.embed(model=name, input="warm-up", keep_alive=self.keep_alive)
+            else:
+                # An empty prompt only loads the model
+                response = await endpoint.client.generate(model=name, prompt="", keep_alive=self.keep_alive)
+        except Exception as e:
+            info["state"] = "error"
+            logger.error(f"Failed to warm model {name} on {endpoint.url}: {e}")
+            return False
+        
+        load_seconds = (response.get("load_duration") or 0) / 1e9
+        info["last_load_seconds"] = load_seconds
+        if load_seconds >= self.COLD_LOAD_SECONDS:
+            info["cold_starts"] += 1
+            logger.info(f"Model {name} loaded on {endpoint.url} in {load_seconds:.1f}s")
+        info["state"] = "loaded"
+        info["last_seen_loaded"] = time.time()
+        return True
+    
+    async def refresh(self):
+        """Check which models are resident and re-warm any that were unloaded."""
+        for endpoint in self.pool.endpoints:
+            if not endpoint.healthy:
+                continue
+            try:
+                response = await endpoint.client.ps()
+            except Exception as e:
+                logger.warning(f"Model load-state check failed on {endpoint.url}: {e}")
+                continue
+            loaded = {
+                self._canonical(m.get("model") or m.get("name")): m
+                for m in response.get("models") or []
+            }
+            
+            for name in self.models:
+                info = self.state[(endpoint.url, name)]
+                entry = loaded.get(self._canonical(name))
+                if entry is not None:
+                    info["size_vram"] = entry.get("size_vram")
+                    info["last_seen_loaded"] = time.time()
+                elif info["state"] == "loaded":
+                    info["evictions"] += 1
+                    info["state"] = "unloaded"
+                    logger.warning(f"Model {name} was unloaded by Ollama on {endpoint.url}")
+                # Pinging extends keep_alive, and reloads the model if it was evicted
+                await self.warm(endpoint, name)
+    
+    @staticmethod
+    def _canonical(name: str) -> str:
+        """Ollama reports untagged models with the ':latest' tag."""
+        return name if ":" in name else f"{name}:latest"
@@ -0,0 +1,224 @@
+"""Shared pool of Ollama endpoints with load balancing and hedged requests."""
+
+import asyncio
+import itertools
+import logging
+import time
+from collections import deque
+from typing import Optional, Dict, Any, List, Callable, Awaitable, TypeVar
+
+import httpx
+import ollama
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class OllamaEndpoint:
+    """One Ollama server with its pooled client and load counters."""
+    
+    def __init__(self, url: str, timeout: float = 60.0, max_connections: int = 4):
+        self.url = url
+        # Owned here so close() can release the connections; AsyncClient
+        # only takes an httpx client class, not an instance
+        self.transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=300.0
+            )
+        )
+        self.client = ollama.AsyncClient(
+            host=url,
+            timeout=httpx.Timeout(timeout, connect=5.0),
+            transport=self.transport
+        )
+        self.outstanding = 0
+        self.healthy = True
+        self.requests = 0
+        self.errors = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "errors": self.errors
+        }
+
+
+class OllamaEndpointPool:
+    """Balance Ollama calls across endpoints by least outstanding requests.
+    
+    Endpoints failing a periodic health check, or a request with a
+    transport error, are skipped until they recover; a request that hits a
+    transport error is retried once on another endpoint. With hedging on,
+    a request still running after the given latency percentile for its
+    key (call site and model, e.g. "intent:llama3") gets a duplicate on a
+    second endpoint and the first answer wins.
+    """
+    
+    HEALTH_TIMEOUT = 5.0
+    
+    def __init__(
+        self,
+        urls: List[str],
+        timeout: float = 60.0,
+        max_connections: int = 4,
+        health_interval: float = 30.0,
+        hedge: bool = False,
+        hedge_percentile: float = 0.95,
+        hedge_min_samples: int = 20
+    ):
+        if not urls:
+            raise ValueError("At least one Ollama URL is required")
+        self.endpoints = [OllamaEndpoint(url, timeout, max_connections) for url in urls]
+        self.health_interval = health_interval
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        
+        self._latencies: Dict[str, deque] = {}
+        self._rotation = itertools.count()
+        self._health_task: Optional[asyncio.Task] = None
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+    
+    async def start(self):
+        """Start periodic health checks."""
+        if self._health_task is None and self.health_interval:
+            self._health_task = asyncio.create_task(self._health_loop())
+    
+    async def close(self):
+        """Stop health checks and close every endpoint's connections."""
+        if self._health_task:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+        for endpoint in self.endpoints:
+            await endpoint.transport.aclose()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return per-endpoint load and pool-wide hedging counters."""
+        return {
+            "endpoints": [endpoint.stats() for endpoint in self.endpoints],
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers
+        }
+    
+    def pick(self, exclude: Optional[OllamaEndpoint] = None) -> Optional[OllamaEndpoint]:
+        """Return the healthy endpoint with the fewest outstanding requests."""
+        candidates = [e for e in self.endpoints if e is not exclude]
+        healthy = [e for e in candidates if e.healthy]
+        candidates = healthy or candidates
+        if not candidates:
+            return None
+        # Rotate the starting point so ties don't always go to the first URL
+        offset = next(self._rotation) % len(candidates)
+        rotated = candidates[offset:] + candidates[:offset]
+        return min(rotated, key=lambda e: e.outstanding)
+    
+    async def call(self, fn: Callable[[ollama.AsyncClient], Awaitable[T]], key: str = "") -> T:
+        """Run fn(client) against the best endpoint, hedging slow calls if enabled.
+        
+        key groups latency samples for hedging; use one per call site and model.
+        """
+        primary = self.pick()
+        delay = self._hedge_delay(key)
+        if delay is None:
+            return await self._call_with_failover(primary, fn, key)
+        
+        first = asyncio.create_task(self._call_with_failover(primary, fn, key))
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return first.result()
+            secondary = self.pick(exclude=primary)
+            if secondary is None:
+                return await first
+            
+            self.hedged += 1
+            second = asyncio.create_task(self._run(secondary, fn, key))
+            tasks.add(second)
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self.hedge_wins += 1
+                        return task.result()
+                if not tasks:
+                    # Both failed; surface the primary's error
+                    return first.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def _call_with_failover(self, endpoint: OllamaEndpoint, fn: Callable, key: str):
+        try:
+            return await self._run(endpoint, fn, key)
+        except (httpx.TransportError, ConnectionError):
+            other = self.pick(exclude=endpoint)
+            if other is None:
+                raise
+            self.failovers += 1
+            logger.warning(f"Ollama endpoint {endpoint.url} failed; retrying on {other.url}")
+            return await self._run(other, fn, key)
+    
+    async def _run(self, endpoint: OllamaEndpoint, fn: Callable, key: str):
+        endpoint.outstanding += 1
+        endpoint.requests += 1
+        started = time.monotonic()
+        try:
+            result = await fn(endpoint.client)
+        except (httpx.TransportError, ConnectionError):
+            endpoint.errors += 1
+            endpoint.healthy = False
+            raise
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            endpoint.errors += 1
+            raise
+        finally:
+            endpoint.outstanding -= 1
+        self._latencies.setdefault(key, deque(maxlen=200)).append(time.monotonic() - started)
+        endpoint.healthy = True
+        return result
+    
+    def _hedge_delay(self, key: str) -> Optional[float]:
+        """Latency percentile to wait before hedging, or None to not hedge."""
+        if not self.hedge or len(self.endpoints) < 2:
+            return None
+        samples = self._latencies.get(key)
+        if not samples or len(samples) < self.hedge_min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(int(len(ordered) * self.hedge_percentile), len(ordered) - 1)]
+    
+    async def _health_loop(self):
+        while True:
+            await asyncio.gather(*(self._check(endpoint) for endpoint in self.endpoints))
+            await asyncio.sleep(self.health_interval)
+    
+    async def _check(self, endpoint: OllamaEndpoint):
+        try:
+            await asyncio.wait_for(endpoint.client.ps(), timeout=self.HEALTH_TIMEOUT)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if endpoint.healthy:
+                logger.warning(f"Ollama endpoint {endpoint.url} is unhealthy: {e}")
+            endpoint.healthy = False
+            return
+        if not endpoint.healthy:
+            logger.info(f"Ollama endpoint {endpoint.url} recovered")
+        endpoint.healthy = True
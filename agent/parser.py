@@ -1,11 +1,580 @@
 """Intent parser using Ollama for natural language understanding."""
 
+import asyncio
 import json
+import logging
+import os
 import re
-from typing import Optional, Dict, Any
-from datetime import datetime, timedelta
+import statistics
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple, Union
+from datetime import datetime
 import ollama
 
+from .json_store import load_json, save_json
+from .ollama_pool import OllamaEndpointPool
+from .time_expr import TimeExpressionEngine, TimeExpression
+
+try:
+    import numpy as np
+except ImportError:  # optional, only needed for the embedding classifier
+    np = None
+
+logger = logging.getLogger(__name__)
+
+_TIME_EXPRESSIONS = TimeExpressionEngine()
+
+# Words that mean the message carries timing the fast path doesn't understand
+_UNHANDLED_TIME_WORDS = re.compile(
+    r"\b(?:today|tonight|tomorrow|morning|afternoon|evening|night|every|daily|weekly|monthly|next|"
+    r"monday|tuesday|wednesday|thursday|friday|saturday|sunday|(?:at|in)\s+\d+|\d{1,2}(?::\d{2})?\s*(?:am|pm))\b",
+    re.IGNORECASE
+)
+
+# A schedule split off a fast-path search needs an explicit marker; a bare
+# trailing "tomorrow", "sunday" or "july 20" is as likely part of the query
+_EXPLICIT_SCHEDULE = re.compile(
+    r"^(?:(?:start(?:ing)?\s+)?(?:every|each)\s|in\s+(?!the\b)|(?:right\s+)?now$|immediately$|asap$)"
+    r"|(?:^|\s)(?:at|@)\s*(?:\d|noon|midday|midnight)"
+    r"|\d(?::\d{2})?\s*[ap]\.?m\b|\d:\d{2}",
+    re.IGNORECASE
+)
+
+
+def make_intent(
+    action: str,
+    query: Optional[str] = None,
+    task_name: Optional[str] = None,
+    when: Optional[TimeExpression] = None
+) -> Dict[str, Any]:
+    """Build an intent dict in the shape the parser returns."""
+    intent = {
+        "action": action,
+        "query": query,
+        "task_name": task_name
+    }
+    intent.update((when or TimeExpression("immediate")).to_intent_fields())
+    return intent
+
+
+def normalize_message(message: str) -> str:
+    """Collapse whitespace and trailing punctuation in a user message."""
+    return " ".join(message.split()).rstrip(".!")
+
+
+class FastPathRecognizer:
+    """Recognize formulaic commands with compiled patterns, bypassing the LLM.
+    
+    Returns the same intent dict as the LLM parser, or None when the message
+    isn't matched with high confidence so the caller can fall through.
+    """
+    
+    LIST_TASKS = re.compile(
+        r"^(?:please\s+)?(?:(?:list|show)(?:\s+me)?(?:\s+(?:all|my|the))*(?:\s+scheduled)?\s+tasks"
+        r"|what\s+are\s+my(?:\s+scheduled)?\s+tasks)$",
+        re.IGNORECASE
+    )
+    # Only names shaped like the daemon's "<action>-<query>-<YYYYmmddHHMMSS>", so
+    # "cancel my subscription" and the like still reach the LLM
+    CANCEL_TASK = re.compile(
+        r"^(?:please\s+)?(?:cancel|delete|remove)\s+(?:the\s+)?(?:task\s+)?"
+        r"`?(?P<name>[a-z_]+-[^\s`]*-\d{14})`?$",
+        re.IGNORECASE
+    )
+    ADD_NOTE = re.compile(
+        r"^(?:please\s+)?(?:add|save)\s+(?:this\s+|a\s+)?note\s+(?P<quote>[\"'])(?P<note>.+)(?P=quote)"
+        r"(?:\s+to\s+(?:my\s+|the\s+)?(?:rag|knowledge\s+base)(?:\s+system)?)?$",
+        re.IGNORECASE
+    )
+    SEARCH = re.compile(
+        r"^(?:please\s+)?(?:search|look\s+up)\s+(?:for\s+)?(?P<query>.+)$",
+        re.IGNORECASE
+    )
+    
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+    
+    def match(self, message: str, now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """Return an intent for a recognized command, or None."""
+        intent = self._match(normalize_message(message), now or datetime.now())
+        if intent is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return intent
+    
+    def _match(self, text: str, now: datetime) -> Optional[Dict[str, Any]]:
+        if self.LIST_TASKS.match(text):
+            return make_intent("list_tasks")
+        
+        m = self.CANCEL_TASK.match(text)
+        if m:
+            return make_intent("cancel_task", task_name=m.group("name"))
+        
+        m = self.ADD_NOTE.match(text)
+        if m:
+            return make_intent("add_note", query=m.group("note"))
+        
+        m = self.SEARCH.match(text)
+        if not m:
+            return None
+        query, when = _TIME_EXPRESSIONS.split(m.group("query"), now)
+        if when is not None and not _EXPLICIT_SCHEDULE.search(when.text):
+            return None
+        # A query still holding time words means we didn't consume the schedule
+        if not query or _UNHANDLED_TIME_WORDS.search(query):
+            return None
+        return make_intent("search", query=query, when=when)
+    
+
+
+class JSONObjectScanner:
+    """Incrementally locate the first top-level JSON object in streamed text.
+    
+    Feed chunks as they arrive; feed() returns True as soon as the object's
+    closing brace is seen, so generation can be stopped there. Braces inside
+    strings and any text before or after the object are ignored.
+    """
+    
+    def __init__(self):
+        self._parts: list = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self.complete = False
+    
+    def feed(self, chunk: str) -> bool:
+        """Consume a chunk; return True once the top-level object is closed."""
+        if self.complete:
+            return True
+        start = 0 if self._depth else None
+        for i, ch in enumerate(chunk):
+            if self._depth == 0:
+                if ch == '{':
+                    self._depth = 1
+                    start = i
+                continue
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == '\\':
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == '{':
+                self._depth += 1
+            elif ch == '}':
+                self._depth -= 1
+                if self._depth == 0:
+                    self._parts.append(chunk[start:i + 1])
+                    self.complete = True
+                    return True
+        if start is not None:
+            self._parts.append(chunk[start:])
+        return False
+    
+    def result(self) -> Optional[Dict[str, Any]]:
+        """Decode the completed object, or None if none was closed.
+        
+        Raises json.JSONDecodeError if the object text is malformed.
+        """
+        if not self.complete:
+            return None
+        return json.loads("".join(self._parts))
+
+
+class IntentCache:
+    """LRU cache of parsed intents with a TTL, keyed on normalized message text.
+    
+    Schedules are stored as the time phrase they were resolved from and
+    re-resolved on every hit, so "tomorrow at 2pm" never replays a stale
+    timestamp. Intents without a resolvable phrase aren't cached.
+    """
+    
+    SAVE_EVERY = 20  # writes between saves when persisting
+    
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl: float = 6 * 3600,
+        persist_path: Optional[str] = None
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.persist_path = Path(persist_path) if persist_path else None
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._unsaved = 0
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        
+        if self.persist_path:
+            self.load()
+    
+    @staticmethod
+    def key(message: str) -> str:
+        """Cache key for a message."""
+        return normalize_message(message).lower()
+    
+    def get(self, message: str, now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """Return a cached intent with its schedule resolved against now."""
+        key = self.key(message)
+        entry = self._entries.get(key)
+        if entry is not None and time.time() - entry["stored_at"] > self.ttl:
+            del self._entries[key]
+            self.expirations += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        intent = dict(entry["intent"])
+        if entry["schedule_expr"]:
+            when = _TIME_EXPRESSIONS.parse(entry["schedule_expr"], now)
+            if when is None:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            intent.update(when.to_intent_fields())
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return intent
+    
+    def put(self, message: str, intent: Dict[str, Any]) -> bool:
+        """Cache a successfully parsed intent; returns False if not cacheable."""
+        if intent.get("action", "unknown") == "unknown" or "error" in intent:
+            return False
+        
+        expr = None
+        schedule = intent.get("schedule")
+        if schedule and schedule != "immediate":
+            expr = intent.get("schedule_text")
+            if not expr or _TIME_EXPRESSIONS.parse(expr) is None:
+                return False
+        
+        key = self.key(message)
+        self._entries[key] = {
+            "intent": intent,
+            "schedule_expr": expr,
+            "stored_at": time.time()
+        }
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        
+        self._unsaved += 1
+        if self.persist_path and self._unsaved >= self.SAVE_EVERY:
+            self.save()
+        return True
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return size and hit-rate counters."""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+    
+    def load(self):
+        """Load unexpired entries from the persistence file."""
+        entries = load_json(self.persist_path) or {}
+        cutoff = time.time() - self.ttl
+        for key, entry in entries.items():
+            if entry.get("stored_at", 0) >= cutoff:
+                self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def save(self):
+        """Write entries to the persistence file atomically."""
+        if not self.persist_path:
+            return
+        save_json(self.persist_path, self._entries)
+        self._unsaved = 0
+
+
+class IntentClassifier:
+    """Nearest-neighbour intent classifier over embedded example messages.
+    
+    Labeled examples are embedded once with the configured embedding model
+    and kept as a normalized matrix persisted to disk; only examples not
+    already in the matrix are embedded when it is rebuilt. A message is
+    classified by a similarity-weighted vote over its top-k neighbours.
+    """
+    
+    SEED_EXAMPLES = [
+        ("search articles about Thales", "search"),
+        ("find Python tutorials tomorrow afternoon", "search"),
+        ("look up the latest AI news", "search"),
+        ("what's new with the James Webb telescope", "search"),
+        ("get me reviews of the new Pixel phone every monday", "search"),
+        ("research rust async runtimes for me tonight", "search"),
+        ("add this note 'Nhi likes cat' to my RAG system", "add_note"),
+        ("remember that the server password rotates monthly", "add_note"),
+        ("save a note: meeting moved to Thursday", "add_note"),
+        ("store this in my knowledge base: buy milk", "add_note"),
+        ("list my tasks", "list_tasks"),
+        ("what do I have scheduled", "list_tasks"),
+        ("show me everything that's pending", "list_tasks"),
+        ("which searches are coming up", "list_tasks"),
+        ("cancel search-AI-news-20260208090000", "cancel_task"),
+        ("stop the morning news search", "cancel_task"),
+        ("delete my scheduled task about Thales", "cancel_task"),
+        ("never mind, don't run the python tutorials search", "cancel_task")
+    ]
+    
+    def __init__(
+        self,
+        pool: OllamaEndpointPool,
+        model: str = "nomic-embed-text",
+        persist_path: Optional[str] = "storage/intent_examples.npz",
+        top_k: int = 5,
+        min_similarity: float = 0.75,
+        min_vote: float = 0.7,
+        keep_alive: Optional[Union[str, float]] = None
+    ):
+        self.pool = pool
+        self.model = model
+        self.persist_path = Path(persist_path) if persist_path else None
+        self.top_k = top_k
+        self.min_similarity = min_similarity
+        self.min_vote = min_vote
+        self.keep_alive = keep_alive
+        
+        self.texts: List[str] = []
+        self.labels: List[str] = []
+        self.matrix = None
+        self._ready = False
+        self._lock = asyncio.Lock()
+        
+        self.classified = 0
+        self.fallthrough = 0
+    
+    @property
+    def available(self) -> bool:
+        return np is not None
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return classifier counters."""
+        return {
+            "examples": len(self.texts),
+            "classified": self.classified,
+            "fallthrough": self.fallthrough
+        }
+    
+    async def classify(self, message: str) -> Optional[Tuple[str, float]]:
+        """Return (action, similarity) for a confident match, or None."""
+        await self._ensure_ready()
+        if self.matrix is None or not len(self.labels):
+            return None
+        
+        vector = (await self._embed([normalize_message(message)]))[0]
+        scores = self.matrix @ vector
+        k = min(self.top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        
+        votes: Dict[str, float] = {}
+        for idx in top:
+            votes[self.labels[idx]] = votes.get(self.labels[idx], 0.0) + max(float(scores[idx]), 0.0)
+        action, weight = max(votes.items(), key=lambda item: item[1])
+        best = float(scores[top].max())
+        total = sum(votes.values())
+        
+        if best < self.min_similarity or not total or weight / total < self.min_vote:
+            self.fallthrough += 1
+            return None
+        self.classified += 1
+        return action, best
+    
+    async def add_examples(self, examples: List[Tuple[str, str]]):
+        """Embed and append labeled examples that aren't in the matrix yet."""
+        await self._ensure_ready()
+        async with self._lock:
+            await self._add(examples)
+    
+    async def _ensure_ready(self):
+        if self._ready:
+            return
+        async with self._lock:
+            if self._ready:
+                return
+            self._load()
+            await self._add(self.SEED_EXAMPLES)
+            self._ready = True
+    
+    async def _add(self, examples: List[Tuple[str, str]]):
+        known = set(zip(self.texts, self.labels))
+        new = [(normalize_message(text), label) for text, label in examples]
+        new = [example for example in dict.fromkeys(new) if example not in known]
+        if not new:
+            return
+        
+        vectors = await self._embed([text for text, _ in new])
+        self.matrix = vectors if self.matrix is None else np.vstack([self.matrix, vectors])
+        self.texts.extend(text for text, _ in new)
+        self.labels.extend(label for _, label in new)
+        self._save()
+        logger.info(f"Intent classifier: embedded {len(new)} new examples ({len(self.texts)} total)")
+    
+    async def _embed(self, texts: List[str]):
+        response = await self.pool.call(
+            lambda client: client.embed(model=self.model, input=texts, keep_alive=self.keep_alive),
+            key=f"embed:{self.model}"
+        )
+        vectors = np.asarray(response["embeddings"], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+    
+    def _load(self):
+        if not self.persist_path or not self.persist_path.exists():
+            return
+        try:
+            with np.load(self.persist_path, allow_pickle=False) as data:
+                if str(data["model"]) != self.model:
+                    logger.info("Embedding model changed; rebuilding intent examples")
+                    return
+                self.matrix = data["vectors"]
+                self.texts = data["texts"].tolist()
+                self.labels = data["labels"].tolist()
+        except Exception as e:
+            logger.warning(f"Could not load intent examples: {e}")
+    
+    def _save(self):
+        if not self.persist_path:
+            return
+        self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.persist_path.with_suffix(".tmp.npz")
+        np.savez(
+            tmp_path,
+            model=np.array(self.model),
+            vectors=self.matrix,
+            texts=np.array(self.texts),
+            labels=np.array(self.labels)
+        )
+        os.replace(tmp_path, self.persist_path)
+
+
+class IntentBatcher:
+    """Micro-batching front end for IntentParser.parse.
+    
+    Requests arriving within a short window are collected and dispatched
+    together; identical messages in a window share a single parse. The LLM
+    calls themselves are bounded by the parser's concurrency limit, so a
+    burst is pipelined instead of opening many Ollama contexts at once.
+    Each caller gets its own future, and a parse is cancelled only when
+    every caller waiting on it has gone away.
+    """
+    
+    def __init__(self, parser: "IntentParser", window: float = 0.01, max_batch: int = 16):
+        self.parser = parser
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: Dict[str, Tuple[str, List[asyncio.Future]]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+        
+        self.requests = 0
+        self.batches = 0
+        self.coalesced = 0
+        self.largest_batch = 0
+    
+    async def parse(self, message: str) -> Dict[str, Any]:
+        """Queue a message for the next batch and wait for its intent."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.requests += 1
+        
+        key = IntentCache.key(message)
+        if key in self._pending:
+            self.coalesced += 1
+            self._pending[key][1].append(future)
+        else:
+            self._pending[key] = (message, [future])
+        
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+    
+    async def close(self):
+        """Cancel outstanding parses."""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return batching counters."""
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "coalesced": self.coalesced,
+            "largest_batch": self.largest_batch
+        }
+    
+    def _flush(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(batch))
+        
+        for message, futures in batch.values():
+            task = asyncio.create_task(self._dispatch(message, futures))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            for future in futures:
+                future.add_done_callback(lambda _, task=task, futures=futures: self._abandon(task, futures))
+    
+    async def _dispatch(self, message: str, futures: List[asyncio.Future]):
+        try:
+            intent = await self.parser.parse(message)
+        except asyncio.CancelledError:
+            for future in futures:
+                future.cancel()
+            raise
+        except Exception as e:
+            intent = {"action": "unknown", "error": str(e)}
+        for future in futures:
+            if not future.done():
+                future.set_result(dict(intent))
+    
+    @staticmethod
+    def _abandon(task: asyncio.Task, futures: List[asyncio.Future]):
+        """Cancel a parse once all of its callers have been cancelled."""
+        if all(future.cancelled() for future in futures):
+            task.cancel()
+
 
 class IntentParser:
     """Parse natural language into structured intents using Ollama."""
@@ -22,89 +591,300 @@ Available actions:
 Extract these fields:
 - action: The main action (search, add_note, list_tasks, cancel_task, unknown)
 - query: The search query or note content
-- schedule: When to execute (immediate, specific time in ISO format, or null)
-- recurrence: If recurring (daily, weekly, monthly, or null)
+- schedule: The time phrase exactly as the user wrote it (e.g. "tomorrow at 2pm", "every monday at 9"), or "immediate"
+- schedule_time: When the task should first run, as an ISO datetime (e.g. "2026-02-08T14:00:00"), or null if immediate
 - task_name: For cancel_task action, the name of task to cancel
+- confidence: How sure you are of this interpretation, from 0.0 to 1.0
 
 Respond ONLY with valid JSON in this exact format:
 {
   "action": "search",
   "query": "articles about Thales",
-  "schedule": "2026-02-08T14:00:00",
-  "recurrence": null,
-  "task_name": null
+  "schedule": "tomorrow at 2pm",
+  "schedule_time": "2026-02-08T14:00:00",
+  "task_name": null,
+  "confidence": 0.9
 }
 
-If schedule is relative (e.g., "tomorrow at 2pm"), convert to ISO format.
-If no schedule specified, use "immediate".
-If query contains quotes, preserve them.
-Be precise with dates and times."""
+Copy the time phrase into schedule unchanged, and work out schedule_time from the current time given with the command. Keep the phrase out of the query.
+If query contains quotes, preserve them."""
 
-    def __init__(self, model: str = "qwen2.5:7b", base_url: str = "http://localhost:11434"):
-        self.model = model
-        self.client = ollama.Client(host=base_url)
+    INTENT_SCHEMA = {
+        "type": "object",
+        "properties": {
+            "action": {
+                "type": "string",
+                "enum": ["search", "add_note", "list_tasks", "cancel_task", "unknown"]
+            },
+            "query": {"type": ["string", "null"]},
+            "schedule": {"type": ["string", "null"]},
+            "schedule_time": {"type": ["string", "null"]},
+            "task_name": {"type": ["string", "null"]},
+            "confidence": {"type": "number"}
+        },
+        "required": ["action", "query", "schedule", "schedule_time", "task_name", "confidence"]
+    }
     
-    async def parse(self, message: str) -> Dict[str, Any]:
-        """Parse natural language message into structured intent."""
-        try:
-            response = self.client.chat(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self.SYSTEM_PROMPT},
-                    {"role": "user", "content": f"Parse this command: {message}"}
-                ],
-                options={"temperature": 0.3}
+    ACTIONS = ("search", "add_note", "list_tasks", "cancel_task", "unknown")
+    
+    def __init__(
+        self,
+        model: str = "qwen2.5:7b",
+        base_url: str = "http://localhost:11434",
+        timeout: float = 60.0,
+        max_connections: int = 4,
+        fast_path: bool = True,
+        cache_size: int = 1000,
+        cache_ttl: float = 6 * 3600,
+        cache_path: Optional[str] = None,
+        keep_alive: Optional[Union[str, float]] = None,
+        models: Optional[List[str]] = None,
+        confidence_threshold: float = 0.7,
+        classifier: bool = False,
+        embedding_model: str = "nomic-embed-text",
+        classifier_path: Optional[str] = "storage/intent_examples.npz",
+        max_concurrency: int = 2,
+        pool: Optional[OllamaEndpointPool] = None
+    ):
+        # Models are tried smallest first; a tier's answer is only escalated
+        # when it fails validation or reports low confidence
+        self.models = list(models or [model])
+        self.model = self.models[-1]
+        self.confidence_threshold = confidence_threshold
+        self.tiers = [
+            {"model": name, "calls": 0, "accepted": 0, "escalations": 0, "latencies": deque(maxlen=200)}
+            for name in self.models
+        ]
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.time_expressions = _TIME_EXPRESSIONS
+        self.fast_path = FastPathRecognizer() if fast_path else None
+        self.cache = IntentCache(cache_size, cache_ttl, cache_path) if cache_size > 0 else None
+        # Structured output needs Ollama >= 0.5; downgraded to plain JSON mode
+        # the first time the server rejects a schema
+        self.output_format: Any = self.INTENT_SCHEMA
+        self.llm_calls = 0
+        # Bounds concurrent LLM parses; fast-path and cache hits don't queue
+        self.llm_slots = asyncio.Semaphore(max_concurrency)
+        self.llm_waits: deque = deque(maxlen=200)
+        # Requests go through a shared endpoint pool when the daemon provides
+        # one; otherwise a single-endpoint pool of keep-alive connections
+        self._owns_pool = pool is None
+        self.pool = pool or OllamaEndpointPool([base_url], timeout=timeout, max_connections=max_connections)
+        
+        self.classifier = None
+        if classifier:
+            self.classifier = IntentClassifier(
+                self.pool,
+                model=embedding_model,
+                persist_path=classifier_path,
+                keep_alive=keep_alive
             )
+            if not self.classifier.available:
+                logger.warning("numpy is not installed; intent classifier disabled")
+                self.classifier = None
+    
+    async def close(self):
+        """Persist the cache and close the endpoint pool if the parser owns it."""
+        if self.cache:
+            self.cache.save()
+        if self._owns_pool:
+            await self.pool.close()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return parser statistics."""
+        return {
+            "fast_path": self.fast_path.stats() if self.fast_path else None,
+            "cache": self.cache.stats() if self.cache else None,
+            "classifier": self.classifier.stats() if self.classifier else None,
+            "llm": {
+                "calls": self.llm_calls,
+                "p50_wait": statistics.median(self.llm_waits) if self.llm_waits else None
+            },
+            "tiers": [
+                {
+                    "model": tier["model"],
+                    "calls": tier["calls"],
+                    "accepted": tier["accepted"],
+                    "escalation_rate": tier["escalations"] / tier["calls"] if tier["calls"] else 0.0,
+                    "p50_latency": statistics.median(tier["latencies"]) if tier["latencies"] else None
+                }
+                for tier in self.tiers
+            ]
+        }
+    
+    async def parse(self, message: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Parse natural language message into structured intent.
+        
+        Formulaic commands are answered by the fast path and repeated ones by
+        the cache, without an LLM call. Cancelling the calling task aborts the
+        in-flight Ollama request.
+        """
+        if self.fast_path:
+            intent = self.fast_path.match(message)
+            if intent is not None:
+                return intent
+        
+        if self.cache:
+            intent = self.cache.get(message)
+            if intent is not None:
+                return intent
+        
+        action = None
+        if self.classifier:
+            try:
+                match = await self.classifier.classify(message)
+            except Exception as e:
+                logger.warning(f"Intent classifier failed: {e}")
+                match = None
+            if match:
+                action = match[0]
+                if action == "list_tasks":
+                    return make_intent(action)
+        
+        queued = time.monotonic()
+        async with self.llm_slots:
+            self.llm_waits.append(time.monotonic() - queued)
+            intent = await self._parse_llm(message, timeout or self.timeout, action)
+        if self.cache:
+            self.cache.put(message, intent)
+        return intent
+    
+    async def _parse_llm(self, message: str, timeout: float, action: Optional[str] = None) -> Dict[str, Any]:
+        """Parse a message with the model cascade, escalating weak answers.
+        
+        When the action is already known, the model only fills in the slots.
+        """
+        prompt = f"Current time: {datetime.now().strftime('%A %Y-%m-%dT%H:%M')}\nParse this command: {message}"
+        if action:
+            prompt += f'\nThe action is "{action}"; extract the remaining fields.'
+        messages = [
+            {"role": "system", "content": self.SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+        deadline = time.monotonic() + timeout
+        error = None
+        for i, tier in enumerate(self.tiers):
+            is_last = i == len(self.tiers) - 1
+            started = time.monotonic()
+            tier["calls"] += 1
+            try:
+                parsed = await asyncio.wait_for(
+                    self._chat_json(tier["model"], messages),
+                    timeout=max(deadline - started, 0)
+                )
+                if action and parsed is not None:
+                    parsed["action"] = action
+                error = self._validate_intent(parsed)
+                if error is None:
+                    # Schedules are resolved here; the model's own ISO time only
+                    # covers phrases the engine doesn't know
+                    when = self.time_expressions.parse(parsed.get("schedule") or "immediate")
+                    if when is None:
+                        when = self._model_schedule(parsed)
+                    if when is None:
+                        error = (
+                            f"I couldn't work out when {parsed.get('schedule')!r} is. "
+                            f"Try something like \"tomorrow at 2pm\" or \"every monday at 9am\"."
+                        )
+            except asyncio.TimeoutError:
+                return {"action": "unknown", "error": f"Intent parsing timed out after {timeout:.0f}s"}
+            except json.JSONDecodeError:
+                error = "Failed to parse JSON"
+            except Exception as e:
+                error = str(e)
+            finally:
+                tier["latencies"].append(time.monotonic() - started)
             
-            content = response['message']['content']
-            json_match = re.search(r'\{.*\}', content, re.DOTALL)
-            
-            if json_match:
-                try:
-                    parsed = json.loads(json_match.group())
-                    parsed['schedule'] = self._normalize_schedule(parsed.get('schedule'))
+            if error is None:
+                confidence = self._confidence(parsed)
+                if confidence >= self.confidence_threshold or is_last:
+                    tier["accepted"] += 1
+                    parsed.update(when.to_intent_fields())
                     return parsed
-                except json.JSONDecodeError:
-                    return {"action": "unknown", "error": "Failed to parse JSON"}
+                error = f"Low confidence ({confidence:.2f})"
             
-            return {"action": "unknown", "error": "No JSON found in response"}
-        except Exception as e:
-            return {"action": "unknown", "error": str(e)}
-    
-    def _normalize_schedule(self, schedule: Optional[str]) -> Optional[str]:
-        """Convert various time formats to ISO format."""
-        if not schedule or schedule == "immediate":
-            return "immediate"
+            if not is_last:
+                tier["escalations"] += 1
+                logger.debug(f"Escalating intent parse from {tier['model']}: {error}")
         
-        # If already ISO format, return as-is
+        return {"action": "unknown", "error": error}
+    
+    def _validate_intent(self, parsed: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Check a model answer against the intent schema; return the problem, if any."""
+        if parsed is None:
+            return "No JSON found in response"
+        action = parsed.get("action")
+        if action not in self.ACTIONS:
+            return f"Invalid action: {action!r}"
+        for field in ("query", "schedule", "schedule_time", "task_name"):
+            if not isinstance(parsed.get(field), (str, type(None))):
+                return f"Invalid {field}: {parsed.get(field)!r}"
+        if action in ("search", "add_note") and not (parsed.get("query") or "").strip():
+            return f"Missing query for {action}"
+        if action == "cancel_task" and not (parsed.get("task_name") or "").strip():
+            return "Missing task_name for cancel_task"
+        return None
+    
+    @staticmethod
+    def _model_schedule(parsed: Dict[str, Any]) -> Optional[TimeExpression]:
+        """The model's ISO schedule_time, kept under the user's phrase so it is never cached."""
         try:
-            datetime.fromisoformat(schedule.replace('Z', '+00:00'))
-            return schedule
+            run_date = datetime.fromisoformat((parsed.get("schedule_time") or "").replace("Z", "+00:00"))
         except ValueError:
-            pass
-        
-        # Handle relative times
-        now = datetime.now()
-        schedule_lower = schedule.lower()
-        
-        if schedule_lower == "tomorrow":
-            return (now + timedelta(days=1)).isoformat()
-        elif schedule_lower == "today":
-            return now.isoformat()
-        elif schedule_lower.startswith("in "):
-            # Handle "in X minutes/hours/days"
-            parts = schedule_lower.split()
-            if len(parts) >= 3:
-                try:
-                    amount = int(parts[1])
-                    unit = parts[2]
-                    if "minute" in unit:
-                        return (now + timedelta(minutes=amount)).isoformat()
-                    elif "hour" in unit:
-                        return (now + timedelta(hours=amount)).isoformat()
-                    elif "day" in unit:
-                        return (now + timedelta(days=amount)).isoformat()
-                except ValueError:
-                    pass
-        
-        return schedule
+            return None
+        return TimeExpression(parsed.get("schedule") or run_date.isoformat(), run_date=run_date)
+    
+    @staticmethod
+    def _confidence(parsed: Dict[str, Any]) -> float:
+        """Model-reported confidence; answers without one are trusted."""
+        try:
+            return float(parsed.get("confidence", 1.0))
+        except (TypeError, ValueError):
+            return 0.0
+    
+    async def _chat_json(self, model: str, messages: list) -> Optional[Dict[str, Any]]:
+        """Run a chat request in structured output mode and return its JSON object."""
+        try:
+            return await self._stream_json(model, messages, self.output_format)
+        except ollama.ResponseError as e:
+            if self.output_format == "json" or e.status_code != 400:
+                raise
+            logger.info(f"Ollama rejected schema output ({e}); falling back to JSON mode")
+            self.output_format = "json"
+            return await self._stream_json(model, messages, self.output_format)
+    
+    async def _stream_json(self, model: str, messages: list, output_format: Any) -> Optional[Dict[str, Any]]:
+        """Stream a completion from the least loaded endpoint."""
+        return await self.pool.call(
+            lambda client: self._stream_from(client, model, messages, output_format),
+            key=f"intent:{model}"
+        )
+    
+    async def _stream_from(
+        self,
+        client: ollama.AsyncClient,
+        model: str,
+        messages: list,
+        output_format: Any
+    ) -> Optional[Dict[str, Any]]:
+        """Stream a completion, stopping generation once the JSON object closes."""
+        self.llm_calls += 1
+        scanner = JSONObjectScanner()
+        stream = await client.chat(
+            model=model,
+            messages=messages,
+            format=output_format,
+            stream=True,
+            options={"temperature": 0.3},
+            keep_alive=self.keep_alive
+        )
+        try:
+            async for part in stream:
+                if scanner.feed(part['message']['content']):
+                    # Closing the stream drops the HTTP response, which makes
+                    # Ollama abort the rest of the generation
+                    break
+        finally:
+            await stream.aclose()
+        return scanner.result()
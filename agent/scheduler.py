@@ -2,7 +2,7 @@
 
 import asyncio
 import json
-from datetime import datetime
+from datetime import datetime, tzinfo
 from typing import Optional, Dict, Any, Callable
 from pathlib import Path
 
@@ -98,11 +98,16 @@ class TaskScheduler:
         params: Dict[str, Any],
         cron_expression: str,
         callback: Callable,
-        user_id: str
+        user_id: str,
+        timezone: Optional[tzinfo] = None
     ) -> bool:
-        """Schedule a recurring task with cron expression."""
+        """Schedule a recurring task with cron expression.
+        
+        Without a timezone the expression is read in the local zone, like
+        the naive run dates one-time tasks get.
+        """
         try:
-            trigger = CronTrigger.from_crontab(cron_expression)
+            trigger = CronTrigger.from_crontab(cron_expression, timezone=timezone)
             return self.schedule_task(task_id, action, params, trigger, callback, user_id)
         except Exception as e:
             print(f"Error parsing cron expression: {e}")
@@ -0,0 +1,462 @@
+"""Compiled natural-language time expressions for task schedules."""
+
+import re
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Optional, Dict, Any, List, Tuple
+
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+CRON_WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+MONTHS = [
+    "january", "february", "march", "april", "may", "june",
+    "july", "august", "september", "october", "november", "december"
+]
+
+# Default clock time for a part of the day
+PART_OF_DAY = {
+    "morning": (9, 0),
+    "afternoon": (15, 0),
+    "evening": (18, 0),
+    "night": (21, 0),
+    "tonight": (21, 0),
+    "noon": (12, 0),
+    "midday": (12, 0),
+    "midnight": (0, 0)
+}
+
+# Fixed offsets for common zone abbreviations (no DST handling)
+TZ_ABBREVIATIONS = {
+    "utc": 0, "gmt": 0, "z": 0,
+    "est": -300, "edt": -240, "cst": -360, "cdt": -300,
+    "mst": -420, "mdt": -360, "pst": -480, "pdt": -420,
+    "bst": 60, "cet": 60, "cest": 120, "ist": 330,
+    "ict": 420, "sgt": 480, "jst": 540, "aest": 600
+}
+
+NUMBER_WORDS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+                "six": 6, "ten": 10, "fifteen": 15, "twenty": 20, "thirty": 30}
+
+_WEEKDAY = r"(?:mon(?:day)?|tue(?:s(?:day)?)?|wed(?:nesday)?|thu(?:r(?:s(?:day)?)?)?|fri(?:day)?|sat(?:urday)?|sun(?:day)?)"
+# Plurals need the full name, so "tues" and "thurs" stay single days
+_WEEKDAY_PLURAL = r"(?:mon|tues|wednes|thurs|fri|satur|sun)days"
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*"
+_TZ_ABBR = "|".join(sorted(TZ_ABBREVIATIONS, key=len, reverse=True))
+_UNIT = r"(?P<unit>min(?:ute)?s?|h(?:ou)?rs?|hours?|days?|weeks?)"
+
+
+def _compile(pattern: str) -> "re.Pattern":
+    return re.compile(pattern, re.IGNORECASE)
+
+
+_NOW = _compile(r"(?:right\s+)?(?:now|immediately|asap)\b")
+
+# Each component is matched at the current position; an expression is a
+# sequence of components separated by whitespace or commas.
+_COMPONENTS = [
+    ("now", _NOW),
+    ("relative", _compile(
+        r"in\s+(?:(?P<half>half\s+an?\s+hour)|(?P<amount>\d+|" + "|".join(NUMBER_WORDS) + r")\s*" + _UNIT + r")\b"
+    )),
+    ("recurring", _compile(
+        r"(?:every|each)\s+(?:(?P<interval>\d+|other)\s+)?"
+        r"(?P<every>minute|hour|day|week|month|weekday|weekend|morning|afternoon|evening|night|" + _WEEKDAY + r")s?"
+        r"(?P<more>(?:\s*(?:,|and|&)\s*" + _WEEKDAY + r"s?)*)\b"
+    )),
+    ("adverb", _compile(r"(?P<adverb>hourly|daily|nightly|weekly|monthly)\b")),
+    ("plural_weekday", _compile(
+        r"(?:on\s+)?(?P<days>" + _WEEKDAY_PLURAL + r"(?:\s*(?:,|and|&)\s*" + _WEEKDAY_PLURAL + r")*)\b"
+    )),
+    ("iso", _compile(
+        r"(?:on\s+)?(?P<year>\d{4})-(?P<month>\d{2})-(?P<day>\d{2})"
+        r"(?:[t\s]+(?P<hour>\d{2}):(?P<minute>\d{2})(?::\d{2}(?:\.\d+)?)?)?\b"
+    )),
+    ("month_day", _compile(
+        r"(?:on\s+)?(?:(?P<month>" + _MONTH + r")\s+(?P<day>\d{1,2})(?:st|nd|rd|th)?"
+        r"|(?:the\s+)?(?P<day2>\d{1,2})(?:st|nd|rd|th)?\s+(?:of\s+)?(?P<month2>" + _MONTH + r"))"
+        r"(?:,?\s+(?P<year>\d{4}))?\b"
+    )),
+    ("day", _compile(
+        r"(?P<day>today|tonight|(?:the\s+)?day\s+after\s+tomorrow|tomorrow)\b"
+        r"|(?:on\s+)?(?:(?P<which>this|next)\s+)?(?P<weekday>" + _WEEKDAY + r")\b"
+    )),
+    ("part", _compile(
+        r"(?:(?:in\s+the|this|at)\s+)?(?P<part>morning|afternoon|evening|night|noon|midday|midnight)\b"
+    )),
+    ("clock", _compile(
+        r"(?P<at>(?:start(?:ing)?\s+)?(?:at|@)\s*)?(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*"
+        r"(?P<ampm>[ap]\.?m\.?)?(?![\w:])"
+    )),
+    ("tz", _compile(
+        r"(?:(?P<abbr>" + _TZ_ABBR + r")\b\s*)?(?:(?P<sign>[+-])(?P<tzh>\d{1,2})(?::?(?P<tzm>\d{2}))?)?(?![\w])"
+    ))
+]
+
+_SEPARATOR = _compile(r"[\s,]*(?:and\s+|then\s+)?")
+
+_START_ATTEMPT = _compile(
+    r"(?:start(?:ing)?\s+)?(?:at|@|on|in|every|each|the|this|next|right|now|immediately|asap|today|tonight|"
+    r"tomorrow|day|hourly|daily|nightly|weekly|monthly|morning|afternoon|evening|night|noon|midday|midnight|"
+    + _WEEKDAY + r"|" + _MONTH + r"|\d)"
+)
+
+
+class TimeExpression:
+    """A resolved schedule: a concrete next run and, for recurrences, a cron expression."""
+    
+    def __init__(
+        self,
+        text: str,
+        run_date: Optional[datetime] = None,
+        cron: Optional[str] = None,
+        recurrence: Optional[str] = None,
+        tz: Optional[tzinfo] = None
+    ):
+        self.text = text
+        self.run_date = run_date
+        self.cron = cron
+        self.recurrence = recurrence
+        self.tz = tz
+    
+    @property
+    def immediate(self) -> bool:
+        return self.run_date is None and self.cron is None
+    
+    @property
+    def schedule(self) -> str:
+        """ISO run date, or "immediate"."""
+        return "immediate" if self.run_date is None else self.run_date.isoformat()
+    
+    def to_intent_fields(self) -> Dict[str, Any]:
+        """Fields merged into an intent dict."""
+        return {
+            "schedule": self.schedule,
+            "recurrence": self.recurrence,
+            "cron": self.cron,
+            "schedule_text": self.text
+        }
+    
+    def __repr__(self) -> str:
+        return f"TimeExpression({self.text!r}, run_date={self.schedule}, cron={self.cron!r})"
+
+
+class TimeExpressionEngine:
+    """Resolve time phrases like "tomorrow afternoon", "every monday at 9" or
+    "at 14:30 UTC+7" without an LLM.
+    
+    parse() resolves a phrase on its own; split() finds a phrase at the end
+    of a message. Times without a zone are naive local times, matching the
+    rest of the daemon; an explicit zone produces an aware datetime. An
+    explicit day is kept even when its time has passed ("today at 9am" at
+    noon), so callers must reject run dates in the past.
+    """
+    
+    def parse(self, text: Optional[str], now: Optional[datetime] = None) -> Optional[TimeExpression]:
+        """Resolve a time phrase, or return None if it isn't understood."""
+        if text is None:
+            return None
+        phrase = " ".join(text.split()).strip(" .,!")
+        if not phrase or phrase.lower() == "immediate":
+            return TimeExpression(phrase or "immediate")
+        now = now or datetime.now()
+        
+        # Fully specified ISO timestamps pass straight through
+        try:
+            return TimeExpression(phrase, run_date=datetime.fromisoformat(phrase.replace("Z", "+00:00")))
+        except ValueError:
+            pass
+        
+        parts = self._components(phrase)
+        if parts is None:
+            return None
+        return self._resolve(phrase, parts, now)
+    
+    def split(self, message: str, now: Optional[datetime] = None) -> Tuple[str, Optional[TimeExpression]]:
+        """Split a trailing time phrase off a message: (rest, expression)."""
+        text = " ".join(message.split())
+        for m in re.finditer(r"(?:^|\s)(?=\S)", text):
+            start = m.end()
+            if not _START_ATTEMPT.match(text, start):
+                continue
+            expression = self.parse(text[start:], now)
+            # Only an explicit "now" is worth splitting off as an immediate schedule
+            if expression is not None and (not expression.immediate or _NOW.fullmatch(expression.text)):
+                return text[:start].strip(), expression
+        return text, None
+    
+    def _components(self, phrase: str) -> Optional[Dict[str, "re.Match"]]:
+        """Match the phrase as a sequence of distinct components."""
+        found: Dict[str, re.Match] = {}
+        pos = 0
+        while pos < len(phrase):
+            pos = _SEPARATOR.match(phrase, pos).end()
+            if pos >= len(phrase):
+                break
+            for name, pattern in _COMPONENTS:
+                if name in found:
+                    continue
+                m = pattern.match(phrase, pos)
+                if m and m.end() > pos:
+                    found[name] = m
+                    pos = m.end()
+                    break
+            else:
+                return None
+        return found or None
+    
+    def _resolve(self, phrase: str, parts: Dict[str, "re.Match"], now: datetime) -> Optional[TimeExpression]:
+        tz = self._timezone(parts.get("tz"))
+        if "tz" in parts and tz is None:
+            return None
+        if tz is not None:
+            now = (now if now.tzinfo else now.astimezone()).astimezone(tz)
+        
+        if "now" in parts:
+            return TimeExpression(phrase) if len(parts) == 1 else None
+        
+        if "relative" in parts:
+            if len(parts) > 1:
+                return None
+            return TimeExpression(phrase, run_date=now + self._relative(parts["relative"]))
+        
+        clock = self._clock(parts.get("clock"), parts.get("part"), parts.get("day"))
+        if "clock" in parts and clock is None:
+            return None
+        
+        if {"recurring", "adverb", "plural_weekday"} & parts.keys():
+            return self._recurring(phrase, parts, clock, now, tz)
+        return self._one_time(phrase, parts, clock, now, tz)
+    
+    def _one_time(
+        self,
+        phrase: str,
+        parts: Dict[str, "re.Match"],
+        clock: Optional[Tuple[int, int]],
+        now: datetime,
+        tz: Optional[tzinfo]
+    ) -> Optional[TimeExpression]:
+        day = None
+        roll_forward = True
+        if "iso" in parts:
+            m = parts["iso"]
+            day = self._date(int(m.group("year")), int(m.group("month")), int(m.group("day")), now)
+            if m.group("hour"):
+                clock = (int(m.group("hour")), int(m.group("minute")))
+            roll_forward = False
+        elif "month_day" in parts:
+            m = parts["month_day"]
+            month = self._month(m.group("month") or m.group("month2"))
+            number = int(m.group("day") or m.group("day2"))
+            year = int(m.group("year")) if m.group("year") else now.year
+            day = self._date(year, month, number, now)
+            if day is not None and not m.group("year") and day.date() < now.date():
+                day = self._date(year + 1, month, number, now)
+            roll_forward = False
+        elif "day" in parts:
+            m = parts["day"]
+            word = (m.group("day") or "").lower()
+            if word in ("today", "tonight"):
+                day = now
+            elif word.endswith("day after tomorrow"):
+                day = now + timedelta(days=2)
+            elif word == "tomorrow":
+                day = now + timedelta(days=1)
+            else:
+                weekday = self._weekday(m.group("weekday"))
+                ahead = (weekday - now.weekday()) % 7
+                # "next friday" on a Friday, or a bare "friday" that would mean right now
+                if ahead == 0 and ((m.group("which") or "").lower() == "next" or clock is None):
+                    ahead = 7
+                day = now + timedelta(days=ahead)
+            roll_forward = word not in ("today", "tonight", "tomorrow") and not word.endswith("tomorrow")
+        if day is None and ("iso" in parts or "month_day" in parts):
+            return None
+        
+        if clock is None:
+            if day is None:
+                return None
+            if "day" in parts and (parts["day"].group("day") or "").lower() == "today":
+                return TimeExpression(phrase)
+            # A bare day keeps the current time of day, like "tomorrow" always has
+            run = day
+        else:
+            run = (day or now).replace(hour=clock[0], minute=clock[1], second=0, microsecond=0)
+            if run <= now and (day is None or roll_forward):
+                # "at 2pm" after 2pm means tomorrow; "monday 9am" on a Monday afternoon means next week
+                run += timedelta(days=7 if day is not None else 1)
+        return TimeExpression(phrase, run_date=run, tz=tz)
+    
+    def _recurring(
+        self,
+        phrase: str,
+        parts: Dict[str, "re.Match"],
+        clock: Optional[Tuple[int, int]],
+        now: datetime,
+        tz: Optional[tzinfo]
+    ) -> Optional[TimeExpression]:
+        if {"iso", "month_day", "day", "relative"} & parts.keys():
+            return None
+        hour, minute = clock or (9, 0)
+        weekdays: Optional[List[int]] = None
+        
+        if "recurring" in parts:
+            m = parts["recurring"]
+            unit = m.group("every").lower()
+            interval = m.group("interval")
+            step = 2 if interval == "other" else int(interval or 1)
+            if unit == "minute":
+                if "clock" in parts or "part" in parts or not 1 <= step < 60:
+                    return None
+                run = self._next_run(now, range(0, 60, step), range(24))
+                return self._interval(phrase, f"*/{step} * * * *", run, "minutely", tz)
+            if unit == "hour":
+                if not 1 <= step < 24:
+                    return None
+                minute = clock[1] if clock else 0
+                cron = f"{minute} */{step} * * *" if step > 1 else f"{minute} * * * *"
+                run = self._next_run(now, [minute], range(0, 24, step))
+                return self._interval(phrase, cron, run, "hourly", tz)
+            if step != 1:
+                return None
+            if unit in PART_OF_DAY:
+                if clock is None:
+                    hour, minute = PART_OF_DAY[unit]
+                elif unit in ("afternoon", "evening", "night") and hour < 12:
+                    hour += 12
+                recurrence = "daily"
+            elif unit == "day":
+                recurrence = "daily"
+            elif unit == "weekday":
+                weekdays, recurrence = [0, 1, 2, 3, 4], "weekly"
+            elif unit == "weekend":
+                weekdays, recurrence = [5, 6], "weekly"
+            elif unit == "week":
+                weekdays, recurrence = [now.weekday()], "weekly"
+            elif unit == "month":
+                return self._monthly(phrase, now.day, hour, minute, now, tz)
+            else:
+                weekdays = [self._weekday(unit)]
+                weekdays += [self._weekday(d) for d in re.findall(_WEEKDAY, m.group("more") or "", re.IGNORECASE)]
+                recurrence = "weekly"
+        elif "plural_weekday" in parts:
+            weekdays = [self._weekday(d) for d in re.findall(_WEEKDAY, parts["plural_weekday"].group("days"), re.IGNORECASE)]
+            recurrence = "weekly"
+        else:
+            adverb = parts["adverb"].group("adverb").lower()
+            if adverb == "hourly":
+                minute = clock[1] if clock else 0
+                return self._interval(phrase, f"{minute} * * * *", self._next_run(now, [minute], range(24)), "hourly", tz)
+            if adverb == "monthly":
+                return self._monthly(phrase, now.day, hour, minute, now, tz)
+            if adverb == "nightly" and clock is None:
+                hour, minute = PART_OF_DAY["night"]
+            if adverb == "weekly":
+                weekdays, recurrence = [now.weekday()], "weekly"
+            else:
+                recurrence = "daily"
+        
+        days = sorted(set(weekdays)) if weekdays else None
+        dow = ",".join(CRON_WEEKDAYS[d] for d in days) if days else "*"
+        cron = f"{minute} {hour} * * {dow}"
+        run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        while run <= now or (days and run.weekday() not in days):
+            run += timedelta(days=1)
+        return TimeExpression(phrase, run_date=run, cron=cron, recurrence=recurrence, tz=tz)
+    
+    def _monthly(self, phrase: str, day: int, hour: int, minute: int, now: datetime, tz) -> Optional[TimeExpression]:
+        if day > 28:
+            # Not every month has the day; keep the schedule well defined
+            return None
+        run = now.replace(day=day, hour=hour, minute=minute, second=0, microsecond=0)
+        if run <= now:
+            run = (run.replace(day=1) + timedelta(days=32)).replace(day=day)
+        return TimeExpression(phrase, run_date=run, cron=f"{minute} {hour} {day} * *", recurrence="monthly", tz=tz)
+    
+    @staticmethod
+    def _interval(phrase: str, cron: str, run: datetime, recurrence: str, tz) -> TimeExpression:
+        return TimeExpression(phrase, run_date=run, cron=cron, recurrence=recurrence, tz=tz)
+    
+    @staticmethod
+    def _next_run(now: datetime, minutes, hours) -> datetime:
+        """First whole minute after now that a cron minute/hour field pair fires on."""
+        run = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        while run.hour not in hours or run.minute not in minutes:
+            run += timedelta(minutes=1)
+        return run
+    
+    @staticmethod
+    def _relative(m: "re.Match") -> timedelta:
+        if m.group("half"):
+            return timedelta(minutes=30)
+        amount = m.group("amount").lower()
+        amount = int(amount) if amount.isdigit() else NUMBER_WORDS[amount]
+        unit = m.group("unit").lower()
+        if unit.startswith("m"):
+            return timedelta(minutes=amount)
+        if unit.startswith("h"):
+            return timedelta(hours=amount)
+        if unit.startswith("d"):
+            return timedelta(days=amount)
+        return timedelta(weeks=amount)
+    
+    @staticmethod
+    def _clock(
+        clock: Optional["re.Match"],
+        part: Optional["re.Match"],
+        day: Optional["re.Match"]
+    ) -> Optional[Tuple[int, int]]:
+        """Hour and minute from a clock and/or part of day; None if invalid."""
+        part_word = part.group("part").lower() if part else None
+        if day is not None and (day.group("day") or "").lower() == "tonight":
+            part_word = part_word or "tonight"
+        if clock is None:
+            return PART_OF_DAY.get(part_word) if part_word else None
+        
+        hour = int(clock.group("hour"))
+        minute = int(clock.group("minute") or 0)
+        ampm = (clock.group("ampm") or "").replace(".", "").lower()
+        if not (clock.group("at") or clock.group("minute") or ampm):
+            # A lone number ("top 10") isn't a time
+            return None
+        if ampm:
+            if not 1 <= hour <= 12:
+                return None
+            hour = hour % 12 + (12 if ampm == "pm" else 0)
+        elif part_word in ("afternoon", "evening", "night", "tonight") and hour < 12:
+            hour += 12
+        elif 1 <= hour <= 6 and part_word != "morning" and not clock.group("hour").startswith("0"):
+            # "at 2" or "at 2:30" almost always means the afternoon; "02:30" is a 24-hour time
+            hour += 12
+        if hour > 23 or minute > 59:
+            return None
+        return hour, minute
+    
+    @staticmethod
+    def _timezone(m: Optional["re.Match"]) -> Optional[tzinfo]:
+        if m is None:
+            return None
+        offset = TZ_ABBREVIATIONS.get((m.group("abbr") or "").lower(), 0)
+        if m.group("sign"):
+            minutes = int(m.group("tzh")) * 60 + int(m.group("tzm") or 0)
+            if minutes > 14 * 60:
+                return None
+            offset += minutes if m.group("sign") == "+" else -minutes
+        elif not m.group("abbr"):
+            return None
+        return timezone(timedelta(minutes=offset))
+    
+    @staticmethod
+    def _weekday(name: str) -> int:
+        prefix = name.lower()[:3]
+        return [d[:3] for d in WEEKDAYS].index(prefix)
+    
+    @staticmethod
+    def _month(name: str) -> int:
+        prefix = name.lower()[:3]
+        return [m[:3] for m in MONTHS].index(prefix) + 1
+    
+    @staticmethod
+    def _date(year: int, month: int, day: int, now: datetime) -> Optional[datetime]:
+        try:
+            return now.replace(year=year, month=month, day=day)
+        except ValueError:
+            return None
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Memory per concurrent search: one Chromium per search vs contexts in a shared Chromium."""
+
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+import click
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tools.browser_pool import BrowserPool, psutil  # noqa: E402
+
+
+def total_rss(pool: BrowserPool) -> int:
+    """RSS of every browser process the pool runs, children included."""
+    stats = pool.stats()
+    return sum(b["rss"] or 0 for b in stats["instances"] + stats["hosts"])
+
+
+async def open_page(pool: BrowserPool, index: int, url: str):
+    page = await pool.browsers[index].browser_context.new_page()
+    await page.goto(url, wait_until="load")
+    return page
+
+
+async def measure(concurrency: int, contexts_per_browser: int, url: str, headless: bool) -> dict:
+    """Launch a pool, load url on every instance at once and record memory."""
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = BrowserPool(
+            max_instances=concurrency,
+            min_instances=concurrency,
+            headless=headless,
+            quota_db_path=str(Path(tmp) / "quota.db"),
+            health_interval=0,
+            contexts_per_browser=contexts_per_browser
+        )
+        await pool.initialize()
+        try:
+            idle = total_rss(pool)
+            indexes = await asyncio.gather(*(pool.checkout() for _ in range(concurrency)))
+            pages = await asyncio.gather(*(open_page(pool, i, url) for i in indexes))
+            loaded = total_rss(pool)
+            processes = len(pool.stats()["hosts"]) or concurrency
+            await asyncio.gather(*(page.close() for page in pages))
+            for index in indexes:
+                pool.checkin(index)
+        finally:
+            await pool.cleanup()
+    return {"processes": processes, "idle": idle, "loaded": loaded}
+
+
+@click.command()
+@click.option('--concurrency', '-n', default=4, help='Concurrent searches (pool instances)')
+@click.option('--url', default='https://example.com', help='Page to load in every instance')
+@click.option('--headless/--no-headless', default=True)
+def main(concurrency, url, headless):
+    """Compare browser memory per concurrent search in both pool modes."""
+    if psutil is None:
+        click.echo("❌ psutil is required to measure memory (pip install psutil)")
+        sys.exit(1)
+    
+    modes = [("processes", 1), ("contexts", concurrency)]
+    click.echo(f"{'mode':<10} {'processes':>9} {'idle MB':>9} {'loaded MB':>10} {'MB/search':>10}")
+    for name, contexts_per_browser in modes:
+        result = asyncio.run(measure(concurrency, contexts_per_browser, url, headless))
+        click.echo(
+            f"{name:<10} {result['processes']:>9} {result['idle'] / 2**20:>9.0f} "
+            f"{result['loaded'] / 2**20:>10.0f} {result['loaded'] / 2**20 / concurrency:>10.1f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -18,11 +18,13 @@ sys.path.insert(0, "external/LEANN")
 from discord_bridge import Bridge, CommandRouter
 
 from agent.core import AgentCore
-from agent.parser import IntentParser
+from agent.model_manager import ModelManager
+from agent.ollama_pool import OllamaEndpointPool
+from agent.parser import IntentParser, IntentBatcher
 from agent.scheduler import TaskScheduler
 from agent.task_manager import TaskManager
 from tools.browser_pool import BrowserPool
-from tools.search import SearchTool
+from tools.search import SearchTool, SearchResultCache
 from tools.rag import LEANNTool
 
 # Setup logging
@@ -50,18 +52,83 @@ class AgentDaemon:
         self.scheduler = TaskScheduler(
             missed_tasks_file=self.config.get('scheduler_missed_task_file', 'storage/missed_tasks.json')
         )
+        # One endpoint pool shared by every Ollama call site
+        self.ollama_pool = OllamaEndpointPool(
+            urls=self.config.get('ollama_urls') or [self.config.get('ollama_url', 'http://localhost:11434')],
+            timeout=self.config.get('ollama_request_timeout', 300),
+            max_connections=self.config.get('ollama_max_connections', 4),
+            health_interval=self.config.get('ollama_health_interval', 30),
+            hedge=self.config.get('ollama_hedge', False),
+            hedge_percentile=self.config.get('ollama_hedge_percentile', 0.95)
+        )
         self.parser = IntentParser(
             model=self.config.get('ollama_intent_model', 'qwen2.5:7b'),
-            base_url=self.config.get('ollama_url', 'http://localhost:11434')
+            base_url=self.config.get('ollama_url', 'http://localhost:11434'),
+            timeout=self.config.get('ollama_timeout', 60),
+            max_connections=self.config.get('ollama_max_connections', 4),
+            fast_path=self.config.get('parser_fast_path', True),
+            cache_size=self.config.get('parser_cache_size', 1000),
+            cache_ttl=self.config.get('parser_cache_ttl', 6 * 3600),
+            cache_path=self.config.get('parser_cache_file', 'storage/intent_cache.json'),
+            keep_alive=self.config.get('ollama_keep_alive', '30m'),
+            models=self.config.get('ollama_intent_models'),
+            confidence_threshold=self.config.get('ollama_confidence_threshold', 0.7),
+            classifier=self.config.get('parser_classifier', False),
+            embedding_model=self.config.get('ollama_embedding_model', 'nomic-embed-text'),
+            classifier_path=self.config.get('parser_classifier_file', 'storage/intent_examples.npz'),
+            max_concurrency=self.config.get('parser_max_concurrency', 2),
+            pool=self.ollama_pool
+        )
+        self.intent_batcher = IntentBatcher(
+            self.parser,
+            window=self.config.get('parser_batch_window_ms', 10) / 1000
+        )
+        warm_models = {name: 'generate' for name in self.parser.models}
+        warm_models[self.config.get('ollama_intent_model', 'qwen2.5:7b')] = 'generate'
+        warm_models[self.config.get('ollama_embedding_model', 'nomic-embed-text')] = 'embed'
+        self.model_manager = ModelManager(
+            models=warm_models,
+            keep_alive=self.config.get('ollama_keep_alive', '30m'),
+            ping_interval=self.config.get('ollama_ping_interval', 120),
+            pool=self.ollama_pool
         )
         self.browser_pool = BrowserPool(
             max_instances=self.config.get('browser_max_instances', 3),
+            min_instances=self.config.get('browser_min_instances', 1),
+            idle_timeout=self.config.get('browser_idle_timeout', 300),
             rate_limit_delay=self.config.get('browser_rate_limit_delay', 30),
             max_per_day=self.config.get('browser_max_searches_per_day', 50),
             headless=self.config.get('browser_headless', True),
-            ollama_model=self.config.get('ollama_intent_model', 'qwen2.5:7b')
+            ollama_model=self.config.get('ollama_intent_model', 'qwen2.5:7b'),
+            ollama_keep_alive=self.config.get('ollama_keep_alive', '30m'),
+            ollama_pool=self.ollama_pool,
+            close_timeout=self.config.get('browser_close_timeout', 10),
+            rate_limit_burst=self.config.get('browser_rate_limit_burst', 1),
+            rate_limit_buckets=self.config.get('browser_rate_limit_buckets'),
+            quota_window=self.config.get('browser_quota_window', 'calendar'),
+            queue_aging=self.config.get('browser_queue_aging', 120),
+            user_weights=self.config.get('browser_user_weights'),
+            direct_serp=self.config.get('browser_direct_serp', True),
+            serp_timeout=self.config.get('browser_timeout', 30),
+            block_resources=self.config.get('browser_block_resources'),
+            block_hosts=self.config.get('browser_block_hosts'),
+            lean_pages=self.config.get('browser_lean_pages', True),
+            recycle_after=self.config.get('browser_recycle_after', 100),
+            max_rss_mb=self.config.get('browser_max_rss_mb', 1024),
+            health_interval=self.config.get('browser_health_interval', 60),
+            contexts_per_browser=self.config.get('browser_contexts_per_browser', 1),
+            context_cookies=self.config.get('browser_context_cookies', 'isolated'),
+            worker_processes=self.config.get('browser_worker_processes', False),
+            search_timeout=self.config.get('browser_search_timeout', 180)
         )
-        self.search_tool = SearchTool(self.browser_pool)
+        search_cache = None
+        if self.config.get('search_cache', True):
+            search_cache = SearchResultCache(
+                ttl=self.config.get('search_cache_ttl', 3600),
+                stale_ttl=self.config.get('search_cache_stale_ttl', 6 * 3600),
+                persist_path=self.config.get('search_cache_file', 'storage/search_cache.json')
+            )
+        self.search_tool = SearchTool(self.browser_pool, cache=search_cache)
         self.rag = LEANNTool(
             index_path=self.config.get('lean_index_path', 'storage/lean_index')
         )
@@ -73,6 +140,7 @@ class AgentDaemon:
         
         self.running = False
         self.current_user_id: str = None
+        self._message_tasks: set = set()
     
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from YAML."""
@@ -92,14 +160,7 @@ class AgentDaemon:
         
         @self.router.command("tasks", description="List all scheduled tasks")
         async def tasks_cmd(message, args):
-            tasks = self.task_manager.list_tasks(status='pending')
-            if tasks:
-                response = "📋 **Scheduled Tasks:**\n"
-                for task in tasks[:10]:  # Limit to 10
-                    response += f"• `{task['name']}` - {task['schedule']}\n"
-            else:
-                response = "📋 No scheduled tasks."
-            await message.reply(response)
+            await self._reply_task_list(message)
         
         @self.router.command("cancel", description="Cancel a task by name")
         async def cancel_cmd(message, args):
@@ -121,10 +182,153 @@ class AgentDaemon:
         @self.router.command("status", description="Check daemon status")
         async def status_cmd(message, args):
             status = "🟢 Running" if self.running else "🔴 Stopped"
-            browser_status = f"Browsers: {len(self.browser_pool.browsers)} instances"
-            daily_searches = f"Searches today: {self.browser_pool.daily_count}/{self.browser_pool.max_per_day}"
+            browser_stats = self.browser_pool.stats()
+            browsers = browser_stats['instances']
+            browser_status = f"Browsers: {len(browsers)}/{browser_stats['max_instances']} running"
+            if browser_stats['hosts']:
+                browser_status += f" (contexts in {len(browser_stats['hosts'])} processes)"
+            elif browser_stats['workers']:
+                browser_status += " (worker processes)"
+            browser_status += f", {browser_stats['idle']} idle"
+            if browser_stats['starting']:
+                browser_status += f", {browser_stats['starting']} starting"
+            if browser_stats['scale_ups'] or browser_stats['reaped']:
+                browser_status += f", {browser_stats['scale_ups']} scaled up / {browser_stats['reaped']} stopped idle"
+            rss = [b['rss'] for b in browsers + browser_stats['hosts'] if b['rss'] is not None]
+            if rss:
+                browser_status += f", {sum(rss) / 2**20:.0f} MB RSS"
+            if browser_stats['p50_setup'] is not None:
+                browser_status += f", setup p50 {browser_stats['p50_setup'] * 1000:.0f} ms"
+            if browser_stats['p50_wait'] is not None:
+                browser_status += (
+                    f", checkout wait p50 {browser_stats['p50_wait']:.2f}s / max {browser_stats['max_wait']:.2f}s"
+                )
+            if browser_stats['recycles'] or browser_stats['crashes']:
+                browser_status += f", {browser_stats['recycles']} recycled, {browser_stats['crashes']} crashed"
+            quota = self.browser_pool.quota.stats()
+            browser_llm = self.browser_pool.llm.stats()
+            if browser_llm['calls']:
+                browser_status += (
+                    f", agent LLM {browser_llm['calls']} calls / "
+                    f"{browser_llm['prompt_tokens']} prompt + {browser_llm['completion_tokens']} completion tokens"
+                )
+            paths = browser_stats['paths']
+            if paths['serp']['searches'] or paths['agent']['searches']:
+                browser_status += "\nSearch paths: " + ", ".join(
+                    f"{name} {path['searches']} (p50 {path['p50_latency']:.1f}s)"
+                    for name, path in paths.items() if path['searches']
+                ) + f", {browser_stats['serp_fallbacks']} fell back to the agent"
+            pages = browser_stats['pages']
+            if pages['p50_bytes'] is not None:
+                browser_status += (
+                    f"\nResults pages: p50 {pages['p50_bytes'] / 1024:.0f} KB"
+                    + (f", load {pages['p50_load']:.2f}s" if pages['p50_load'] is not None else "")
+                    + f", {pages['blocked_requests']} requests blocked"
+                )
+            daily_searches = f"Searches today: {quota['used']}/{quota['limit']}, {browser_stats['coalesced']} coalesced"
+            if quota['remaining'] == 0 and quota['resets_at']:
+                daily_searches += f" (next slot {datetime.fromtimestamp(quota['resets_at']).strftime('%H:%M')})"
+            lines = [status, browser_status, daily_searches]
+            queue = browser_stats['queue']
+            for name in ('interactive', 'scheduled'):
+                if queue[name]['served'] or queue[name]['depth']:
+                    wait = queue[name]['p50_wait']
+                    lines.append(
+                        f"Search queue `{name}`: {queue[name]['depth']} waiting, {queue[name]['served']} served"
+                        + (f", wait p50 {wait:.1f}s / max {queue[name]['max_wait']:.1f}s" if wait is not None else "")
+                    )
+            if self.search_tool.cache:
+                search_cache = self.search_tool.cache.stats()
+                lines.append(
+                    f"Search cache: {search_cache['size']} queries, {search_cache['hit_rate']:.0%} hit rate, "
+                    f"{search_cache['quota_saved']} searches saved"
+                )
+            for key, limiter in self.browser_pool.rate_limiter.stats().items():
+                lines.append(
+                    f"Rate limit `{key}`: {limiter['reservations']} searches, "
+                    f"wait p50 {limiter['p50_wait']:.1f}s / max {limiter['max_wait']:.1f}s"
+                )
+            for browser in browsers:
+                if browser['host'] is not None:
+                    memory = f"context in host {browser['host'] + 1}"
+                elif browser['rss'] is not None:
+                    memory = f"{browser['rss'] / 2**20:.0f} MB"
+                else:
+                    memory = "memory unknown"
+                state = 'recycling' if browser['recycling'] else 'busy' if browser['busy'] else 'idle'
+                lines.append(
+                    f"Browser {browser['index'] + 1}: {state}, "
+                    f"pid {browser['pid'] or '-'}, {memory}, {browser['searches']} searches"
+                    + (f", {browser['recycles']} recycles" if browser['recycles'] else "")
+                    + (f", {browser['crashes']} crashes" if browser['crashes'] else "")
+                )
+            
+            parser_stats = self.parser.stats()
+            fast_path = parser_stats['fast_path']
+            if fast_path:
+                lines.append(
+                    f"Intent fast path: {fast_path['hits']} hits / {fast_path['misses']} misses "
+                    f"({fast_path['hit_rate']:.0%})"
+                )
+            cache = parser_stats['cache']
+            if cache:
+                lines.append(
+                    f"Intent cache: {cache['size']}/{cache['max_entries']} entries, "
+                    f"{cache['hit_rate']:.0%} hit rate"
+                )
+            
+            batching = self.intent_batcher.stats()
+            llm = parser_stats['llm']
+            lines.append(
+                f"Intent batching: {batching['requests']} requests in {batching['batches']} batches, "
+                f"{batching['coalesced']} coalesced"
+                + (f", p50 LLM wait {llm['p50_wait']:.2f}s" if llm['p50_wait'] is not None else "")
+            )
+            
+            classifier = parser_stats['classifier']
+            if classifier:
+                lines.append(
+                    f"Intent classifier: {classifier['classified']} classified, "
+                    f"{classifier['fallthrough']} fell through ({classifier['examples']} examples)"
+                )
+            for tier in parser_stats['tiers']:
+                if tier['calls']:
+                    lines.append(
+                        f"Parser tier `{tier['model']}`: {tier['calls']} calls, "
+                        f"p50 {tier['p50_latency']:.2f}s, {tier['escalation_rate']:.0%} escalated"
+                    )
+            
+            pool = self.ollama_pool.stats()
+            if len(pool['endpoints']) > 1:
+                for endpoint in pool['endpoints']:
+                    health = "up" if endpoint['healthy'] else "down"
+                    lines.append(
+                        f"Ollama `{endpoint['url']}`: {health}, {endpoint['outstanding']} in flight, "
+                        f"{endpoint['requests']} requests, {endpoint['errors']} errors"
+                    )
+                lines.append(
+                    f"Ollama hedging: {pool['hedged']} hedged, {pool['hedge_wins']} won by hedge, "
+                    f"{pool['failovers']} failovers"
+                )
             
-            await message.reply(f"{status}\n{browser_status}\n{daily_searches}")
+            for name, model in self.model_manager.stats().items():
+                states = model['states']
+                state = next(iter(states)) if len(states) == 1 else ", ".join(
+                    f"{count} {state}" for state, count in states.items()
+                )
+                lines.append(
+                    f"Model `{name}`: {state}, "
+                    f"{model['cold_starts']} cold starts, {model['evictions']} evictions"
+                )
+            
+            # Discord rejects messages over 2000 characters; split on line boundaries
+            chunk = ""
+            for line in lines:
+                if chunk and len(chunk) + len(line) + 1 > 1900:
+                    await message.reply(chunk)
+                    chunk = ""
+                chunk = f"{chunk}\n{line}" if chunk else line
+            await message.reply(chunk)
         
         @self.router.default
         async def default_handler(message, args):
@@ -134,19 +338,33 @@ class AgentDaemon:
             
             logger.info(f"Processing natural language from {message.author_name}: {content}")
             
-            # Parse intent
-            intent = await self.parser.parse(content)
+            # Parse intent (batched with other messages arriving in a burst)
+            intent = await self.intent_batcher.parse(content)
             logger.info(f"Parsed intent: {intent}")
             
             # Handle the intent
             await self._handle_intent(intent, message)
     
+    async def _reply_task_list(self, message):
+        """Reply with the pending scheduled tasks."""
+        tasks = self.task_manager.list_tasks(status='pending')
+        if tasks:
+            response = "📋 **Scheduled Tasks:**\n"
+            for task in tasks[:10]:  # Limit to 10
+                response += f"• `{task['name']}` - {task['schedule']}\n"
+        else:
+            response = "📋 No scheduled tasks."
+        await message.reply(response)
+    
     async def _handle_intent(self, intent: Dict[str, Any], message):
         """Handle parsed intent."""
         action = intent.get('action', 'unknown')
         query = intent.get('query', '')
         schedule = intent.get('schedule', 'immediate')
         recurrence = intent.get('recurrence')
+        cron = intent.get('cron')
+        # Messages are handled concurrently, so don't rely on current_user_id
+        user_id = str(message.author_id)
         
         if action == 'unknown':
             error = intent.get('error', 'Could not understand command')
@@ -154,13 +372,15 @@ class AgentDaemon:
             return
         
         if action == 'list_tasks':
-            # Trigger tasks command
-            await self.router.handle(message)
+            # Re-routing the message would land back in the default handler
+            await self._reply_task_list(message)
             return
         
         if action == 'cancel_task':
             task_name = intent.get('task_name', '')
             if task_name:
+                # Recurring jobs would otherwise keep firing
+                self.scheduler.cancel_task(task_name)
                 success = self.task_manager.cancel_task(task_name)
                 if success:
                     await message.reply(f"✅ Task `{task_name}` cancelled.")
@@ -189,6 +409,11 @@ class AgentDaemon:
                     run_date = datetime.fromisoformat(schedule.replace('Z', '+00:00'))
                 else:
                     run_date = schedule
+                if not cron and run_date <= datetime.now(run_date.tzinfo):
+                    await message.reply(
+                        f"❌ {run_date.strftime('%Y-%m-%d %H:%M')} has already passed. Please pick a later time."
+                    )
+                    return
                 
                 # Save to task manager
                 self.task_manager.create_task(
@@ -196,23 +421,40 @@ class AgentDaemon:
                     action=action,
                     params={'query': query},
                     schedule=schedule,
-                    user_id=self.current_user_id,
+                    user_id=user_id,
                     recurrence=recurrence
                 )
                 
                 # Schedule with APScheduler
-                success = self.scheduler.schedule_one_time(
-                    task_id=task_name,
-                    action=action,
-                    params={'query': query},
-                    run_date=run_date,
-                    callback=self._execute_scheduled_task,
-                    user_id=self.current_user_id
-                )
+                if cron:
+                    success = self.scheduler.schedule_recurring(
+                        task_id=task_name,
+                        action=action,
+                        params={'query': query},
+                        cron_expression=cron,
+                        callback=self._execute_scheduled_task,
+                        user_id=user_id,
+                        timezone=run_date.tzinfo
+                    )
+                else:
+                    success = self.scheduler.schedule_one_time(
+                        task_id=task_name,
+                        action=action,
+                        params={'query': query},
+                        run_date=run_date,
+                        callback=self._execute_scheduled_task,
+                        user_id=user_id
+                    )
                 
                 if success:
                     time_str = run_date.strftime('%Y-%m-%d %H:%M')
-                    await message.reply(f"⏰ Task scheduled for {time_str}\nName: `{task_name}`")
+                    if cron:
+                        await message.reply(
+                            f"🔁 Task scheduled {intent.get('schedule_text')} (`{cron}`), next run {time_str}\n"
+                            f"Name: `{task_name}`"
+                        )
+                    else:
+                        await message.reply(f"⏰ Task scheduled for {time_str}\nName: `{task_name}`")
                 else:
                     await message.reply("❌ Failed to schedule task.")
                     
@@ -224,7 +466,7 @@ class AgentDaemon:
         """Execute long-running task and send results using message.reply()."""
         try:
             if action == 'search':
-                results = await self.search_tool.search(query)
+                results = await self.search_tool.search(query, user_id=str(original_message.author_id))
                 await self.rag.add_search_results(results)
                 
                 # Prepare result message
@@ -261,13 +503,26 @@ class AgentDaemon:
         user_id: str
     ):
         """Execute a scheduled task."""
+        task = self.task_manager.get_task(task_id)
+        if task is None:
+            # Cancelled, but its job was still registered (e.g. restored from the job store)
+            logger.info(f"Skipping deleted task {task_id}")
+            self.scheduler.cancel_task(task_id)
+            return
         logger.info(f"Executing scheduled task: {task_id}")
         
         try:
             query = params.get('query', '')
             
             if action == 'search':
-                results = await self.search_tool.search(query)
+                # Scheduled searches want fresh results unless the task or config opts in
+                results = await self.search_tool.search(
+                    query,
+                    use_cache=params.get('use_cache', self.config.get('search_cache_scheduled', False)),
+                    ttl=params.get('cache_ttl'),
+                    priority="scheduled",
+                    user_id=user_id
+                )
                 await self.rag.add_search_results(results)
                 await self._notify_user(
                     user_id,
@@ -275,8 +530,9 @@ class AgentDaemon:
                     f"Found {len(results)} articles and added to RAG."
                 )
             
-            # Update task status
-            self.task_manager.update_task_status(task_id, 'completed', datetime.now().isoformat())
+            # Update task status; recurring tasks stay pending for their next run
+            if not task.get('recurrence'):
+                self.task_manager.update_task_status(task_id, 'completed', datetime.now().isoformat())
             
         except Exception as e:
             logger.error(f"Error executing scheduled task {task_id}: {e}")
@@ -311,6 +567,10 @@ class AgentDaemon:
         os.makedirs("storage", exist_ok=True)
         os.makedirs("logs", exist_ok=True)
         
+        # Warm Ollama models in the background while the rest starts up
+        await self.ollama_pool.start()
+        await self.model_manager.start()
+        
         # Initialize browser pool
         await self.browser_pool.initialize()
         
@@ -330,19 +590,35 @@ class AgentDaemon:
         # Main loop
         try:
             async for message in self.bridge.listen():
-                await self.router.handle(message)
+                # Handle each message in its own task so a slow parse doesn't
+                # hold up the messages behind it
+                task = asyncio.create_task(self._handle_message(message))
+                self._message_tasks.add(task)
+                task.add_done_callback(self._message_tasks.discard)
         except asyncio.CancelledError:
             pass
         finally:
             await self.stop()
     
+    async def _handle_message(self, message):
+        """Route one Discord message, logging failures."""
+        try:
+            await self.router.handle(message)
+        except Exception as e:
+            logger.error(f"Error handling message: {e}")
+    
     async def stop(self):
         """Stop the daemon gracefully."""
         logger.info("Stopping daemon...")
         self.running = False
         
         self.scheduler.shutdown()
+        await self.search_tool.close()
         await self.browser_pool.cleanup()
+        await self.intent_batcher.close()
+        await self.parser.close()
+        await self.model_manager.stop()
+        await self.ollama_pool.close()
         await self.bridge.stop()
         
         logger.info("Daemon stopped.")
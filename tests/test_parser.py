@@ -0,0 +1,124 @@
+"""Tests for the fast-path recognizer and the streamed JSON scanner."""
+
+from datetime import datetime
+
+import pytest
+
+from agent.parser import FastPathRecognizer, JSONObjectScanner
+
+# Wednesday, 10:00
+NOW = datetime(2026, 10, 14, 10, 0)
+
+
+@pytest.fixture
+def recognizer():
+    return FastPathRecognizer()
+
+
+@pytest.mark.parametrize("message,action", [
+    ("list tasks", "list_tasks"),
+    ("show me all my scheduled tasks", "list_tasks"),
+    ("What are my scheduled tasks", "list_tasks"),
+    ("add note 'buy milk'", "add_note"),
+    ("please save this note \"call Bob\" to my knowledge base", "add_note")
+])
+def test_commands(recognizer, message, action):
+    intent = recognizer.match(message, NOW)
+    assert (intent["action"] if intent else None) == action
+
+
+@pytest.mark.parametrize("message,name", [
+    ("cancel search-AI-news-20261014100000", "search-AI-news-20261014100000"),
+    ("please delete task `add_note-buy-milk-20261014100000`", "add_note-buy-milk-20261014100000"),
+    ("remove the task search--20261014100000", "search--20261014100000")
+])
+def test_cancel_task_names(recognizer, message, name):
+    intent = recognizer.match(message, NOW)
+    assert intent["action"] == "cancel_task"
+    assert intent["task_name"] == name
+
+
+@pytest.mark.parametrize("message", [
+    "cancel my subscription",
+    "remove notifications",
+    "delete everything",
+    "cancel search-AI-news"
+])
+def test_cancel_needs_a_task_name(recognizer, message):
+    assert recognizer.match(message, NOW) is None
+
+
+@pytest.mark.parametrize("message,query,schedule,cron", [
+    ("search AI news", "AI news", "immediate", None),
+    ("search for the top 10 laptops", "the top 10 laptops", "immediate", None),
+    ("look up AI news now", "AI news", "immediate", None),
+    ("search AI news tomorrow at 2pm", "AI news", "2026-10-15T14:00:00", None),
+    ("search AI news at 5pm", "AI news", "2026-10-14T17:00:00", None),
+    ("search AI news in 2 hours", "AI news", "2026-10-14T12:00:00", None),
+    ("search AI news monday 9am", "AI news", "2026-10-19T09:00:00", None),
+    ("search AI news every monday at 9am", "AI news", "2026-10-19T09:00:00", "0 9 * * mon")
+])
+def test_search_hits(recognizer, message, query, schedule, cron):
+    intent = recognizer.match(message, NOW)
+    assert intent["action"] == "search"
+    assert (intent["query"], intent["schedule"], intent["cron"]) == (query, schedule, cron)
+
+
+@pytest.mark.parametrize("message", [
+    # Bare trailing dates and days are as likely part of the query
+    "look up Apollo 11 july 20",
+    "search flights to paris may 5",
+    "search restaurants open sunday",
+    "search weather tomorrow",
+    "search AI news in the morning",
+    "search AI news daily",
+    # Not search verbs
+    "find flights to paris may 5",
+    "google pixel 9 reviews",
+    "find out if my tasks are done",
+    "hello there"
+])
+def test_search_misses(recognizer, message):
+    assert recognizer.match(message, NOW) is None
+
+
+def test_stats_count_hits_and_misses(recognizer):
+    recognizer.match("list tasks", NOW)
+    recognizer.match("hello there", NOW)
+    assert recognizer.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_scanner_ignores_text_around_the_object():
+    scanner = JSONObjectScanner()
+    assert scanner.feed('Sure! {"action": "search"} and then }}')
+    assert scanner.result() == {"action": "search"}
+
+
+def test_scanner_stops_at_the_first_object():
+    scanner = JSONObjectScanner()
+    assert scanner.feed('{"a": {"b": 1}}{"c": 2}')
+    assert scanner.result() == {"a": {"b": 1}}
+
+
+def test_scanner_braces_and_escaped_quotes_in_strings():
+    scanner = JSONObjectScanner()
+    assert scanner.feed(r'{"query": "say \"}\" {twice}\\", "n": 1}')
+    assert scanner.result() == {"query": 'say "}" {twice}\\', "n": 1}
+
+
+@pytest.mark.parametrize("chunks,closes_at,expected", [
+    (['{"act', 'ion": "sea', 'rch", "query": "a}b"', '}', ' extra'], 3, {"action": "search", "query": "a}b"}),
+    (['pre {', '"q": "x\\', '"y"', ', "n": {"m": 2', '}', '}', '}'], 5, {"q": 'x"y', "n": {"m": 2}}),
+    (list('{"q": "\\"{"}'), 11, {"q": '"{'})
+])
+def test_scanner_object_split_across_chunks(chunks, closes_at, expected):
+    scanner = JSONObjectScanner()
+    assert [scanner.feed(chunk) for chunk in chunks[:closes_at]] == [False] * closes_at
+    assert scanner.feed(chunks[closes_at])
+    assert scanner.result() == expected
+
+
+def test_scanner_incomplete_object():
+    scanner = JSONObjectScanner()
+    assert not scanner.feed('{"query": "unterminated')
+    assert scanner.result() is None
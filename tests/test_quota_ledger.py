@@ -0,0 +1,92 @@
+"""Tests for the SQLite search quota ledger."""
+
+import types
+from datetime import datetime
+
+import pytest
+
+from tools import quota_ledger
+from tools.quota_ledger import QuotaLedger
+
+LATE = datetime(2026, 10, 14, 23, 0).timestamp()
+NEXT_MORNING = datetime(2026, 10, 15, 1, 0).timestamp()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = types.SimpleNamespace(now=LATE)
+    monkeypatch.setattr(quota_ledger, "time", types.SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "quota.db")
+
+
+def test_reserve_until_spent(clock, db_path):
+    ledger = QuotaLedger(db_path, limit=2)
+    first = ledger.reserve()
+    second = ledger.reserve()
+    assert None not in (first, second)
+    assert ledger.reserve() is None
+    assert ledger.remaining() == 0
+
+
+def test_refund_gives_the_slot_back(clock, db_path):
+    ledger = QuotaLedger(db_path, limit=1)
+    reservation = ledger.reserve()
+    ledger.refund(reservation)
+    assert ledger.used() == 0
+    assert ledger.reserve() is not None
+
+
+def test_committed_searches_keep_counting(clock, db_path):
+    ledger = QuotaLedger(db_path, limit=1)
+    ledger.commit(ledger.reserve())
+    assert ledger.used() == 1
+    assert ledger.reserve() is None
+
+
+def test_reservations_survive_restarts(clock, db_path):
+    ledger = QuotaLedger(db_path, limit=3)
+    ledger.reserve()
+    ledger.commit(ledger.reserve())
+    assert QuotaLedger(db_path, limit=3).used() == 2
+
+
+def test_budgets_are_per_key(clock, db_path):
+    QuotaLedger(db_path, limit=1, key="search").reserve()
+    assert QuotaLedger(db_path, limit=1, key="other").reserve() is not None
+
+
+def test_calendar_window_resets_at_midnight(clock, db_path):
+    ledger = QuotaLedger(db_path, limit=1, window="calendar")
+    ledger.reserve()
+    assert ledger.resets_at() == datetime(2026, 10, 15).timestamp()
+
+    clock.now = NEXT_MORNING
+    assert ledger.used() == 0
+    assert QuotaLedger(db_path, limit=1, window="calendar").used() == 0
+    assert ledger.reserve() is not None
+
+
+def test_sliding_window_covers_the_last_day(clock, db_path):
+    ledger = QuotaLedger(db_path, limit=1, window="sliding")
+    ledger.reserve()
+    assert ledger.resets_at() == LATE + 86400
+
+    clock.now = NEXT_MORNING
+    assert ledger.used() == 1
+    assert ledger.reserve() is None
+    assert QuotaLedger(db_path, limit=1, window="sliding").used() == 1
+
+    clock.now = LATE + 86401
+    assert ledger.used() == 0
+    assert ledger.resets_at() is None
+    assert ledger.reserve() is not None
+
+
+def test_unknown_window(db_path):
+    with pytest.raises(ValueError):
+        QuotaLedger(db_path, window="weekly")
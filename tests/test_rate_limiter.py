@@ -0,0 +1,61 @@
+"""Tests for the GCRA rate limiter."""
+
+import pytest
+
+from tools.rate_limiter import RateLimiter
+
+
+def test_interval_spacing():
+    limiter = RateLimiter(interval=10)
+    assert limiter.reserve(now=0) == 0
+    assert limiter.reserve(now=0) == 10
+    assert limiter.reserve(now=5) == 15
+    assert limiter.delay(now=30) == 0
+
+
+def test_burst_goes_back_to_back():
+    limiter = RateLimiter(interval=10, burst=3)
+    assert [limiter.reserve(now=0) for _ in range(3)] == [0, 0, 0]
+    assert limiter.reserve(now=0) == 10
+    assert limiter.reserve(now=0) == 20
+
+
+def test_burst_refills_while_idle():
+    limiter = RateLimiter(interval=10, burst=2)
+    limiter.reserve(now=0)
+    limiter.reserve(now=0)
+    assert limiter.delay(now=5) == 5
+    assert limiter.delay(now=10) == 0
+    # Idle long enough for the full burst again
+    assert [limiter.reserve(now=100) for _ in range(2)] == [0, 0]
+
+
+def test_delay_does_not_book():
+    limiter = RateLimiter(interval=10)
+    limiter.reserve(now=0)
+    assert limiter.delay(now=0) == 10
+    assert limiter.delay(now=0) == 10
+    assert limiter.reserve(now=0) == 10
+
+
+def test_buckets_are_independent_and_override_defaults():
+    limiter = RateLimiter(interval=30, buckets={"google": {"interval": 5, "burst": 2}})
+    assert [limiter.reserve("google", now=0) for _ in range(3)] == [0, 0, 5]
+    assert limiter.reserve("example.com", now=0) == 0
+    assert limiter.reserve("example.com", now=0) == 30
+
+
+@pytest.mark.parametrize("burst", [0, -1])
+def test_burst_is_at_least_one(burst):
+    limiter = RateLimiter(interval=10, burst=burst)
+    assert limiter.reserve(now=0) == 0
+    assert limiter.reserve(now=0) == 10
+
+
+def test_stats_include_time_waited_elsewhere():
+    limiter = RateLimiter(interval=10)
+    limiter.reserve("google", now=0)
+    limiter.reserve("google", now=0, waited=4)
+    assert limiter.stats() == {
+        "google": {"reservations": 2, "p50_wait": 7, "max_wait": 14}
+    }
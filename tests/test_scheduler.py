@@ -0,0 +1,41 @@
+"""Tests for the APScheduler wrapper."""
+
+import time
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("apscheduler")
+tzlocal = pytest.importorskip("tzlocal")
+
+from agent.scheduler import TaskScheduler  # noqa: E402
+from agent.time_expr import TimeExpressionEngine  # noqa: E402
+
+
+@pytest.fixture
+def new_york(monkeypatch):
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    tzlocal.reload_localzone()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+    tzlocal.reload_localzone()
+
+
+async def noop(*args):
+    pass
+
+
+def test_recurring_task_fires_at_local_time(new_york, tmp_path):
+    scheduler = TaskScheduler(missed_tasks_file=str(tmp_path / "missed.json"))
+    when = TimeExpressionEngine().parse("every morning at 9am")
+
+    assert scheduler.schedule_recurring(
+        "search-news-20261014100000", "search", {"query": "news"}, when.cron, noop, "1",
+        timezone=when.run_date.tzinfo
+    )
+    trigger = scheduler.scheduler.get_job("search-news-20261014100000").trigger
+    fire = trigger.get_next_fire_time(None, datetime.now().astimezone())
+    assert (fire.hour, fire.minute) == (9, 0)
+    assert fire.utcoffset() == datetime(fire.year, fire.month, fire.day, 9).astimezone().utcoffset()
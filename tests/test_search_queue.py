@@ -0,0 +1,142 @@
+"""Tests for the browser search queue."""
+
+import asyncio
+import functools
+
+import pytest
+
+from tools.search_queue import SearchQueue
+
+
+def in_loop(test):
+    """Run an async test body in a fresh event loop; push() creates futures."""
+    @functools.wraps(test)
+    def wrapper(*args, **kwargs):
+        return asyncio.run(test(*args, **kwargs))
+    return wrapper
+
+
+def drain(queue: SearchQueue, now: float):
+    """Serve every entry in queue order."""
+    served = []
+    while (entry := queue.peek(now)) is not None:
+        queue.remove(entry, now)
+        served.append(entry)
+    return served
+
+
+@in_loop
+async def test_interactive_before_scheduled():
+    queue = SearchQueue()
+    scheduled = queue.push("scheduled", "a")
+    interactive = queue.push("interactive", "b")
+    assert queue.peek(scheduled["enqueued_at"]) is interactive
+
+
+@in_loop
+async def test_fifo_within_a_class():
+    queue = SearchQueue()
+    entries = [queue.push("interactive") for _ in range(3)]
+    assert drain(queue, entries[0]["enqueued_at"]) == entries
+
+
+@in_loop
+async def test_scheduled_ages_into_interactive():
+    queue = SearchQueue(aging=10)
+    scheduled = queue.push("scheduled", "a")
+    interactive = queue.push("interactive", "b")
+    start = scheduled["enqueued_at"]
+    assert queue.peek(start + 5) is interactive
+    # Same rank and start tag once aged: the earlier push wins
+    assert queue.peek(start + 10) is scheduled
+
+    queue.remove(scheduled, start + 10)
+    stats = queue.stats()
+    assert stats["aged"] == 1
+    assert stats["scheduled"]["served"] == 1
+    assert stats["interactive"]["depth"] == 1
+
+
+@in_loop
+async def test_users_share_fairly():
+    queue = SearchQueue()
+    for _ in range(3):
+        queue.push("interactive", "a")
+    queue.push("interactive", "b")
+    served = drain(queue, 0.0)
+    assert [e["user_id"] for e in served] == ["a", "b", "a", "a"]
+    assert [e["start_tag"] for e in served] == [0.0, 0.0, 1.0, 2.0]
+
+
+@in_loop
+async def test_user_weights_space_start_tags():
+    queue = SearchQueue(user_weights={"a": 2})
+    for _ in range(4):
+        queue.push("interactive", "a")
+    for _ in range(2):
+        queue.push("interactive", "b")
+    served = drain(queue, 0.0)
+    assert [e["user_id"] for e in served] == ["a", "b", "a", "a", "b", "a"]
+    assert [e["start_tag"] for e in served if e["user_id"] == "a"] == [0.0, 0.5, 1.0, 1.5]
+
+
+@in_loop
+async def test_late_user_starts_at_virtual_time():
+    queue = SearchQueue()
+    for _ in range(3):
+        queue.push("interactive", "a")
+    drain(queue, 0.0)
+    # A user arriving after others were served isn't owed their past turns
+    assert queue.push("interactive", "b")["start_tag"] == 2.0
+
+
+@in_loop
+async def test_peek_skips_cancelled_entries():
+    queue = SearchQueue()
+    first = queue.push("interactive")
+    second = queue.push("interactive")
+    first["future"].cancel()
+    assert queue.peek() is second
+    assert len(queue) == 1
+
+
+@in_loop
+async def test_promote_waiting_entry():
+    queue = SearchQueue(aging=60)
+    scheduled = queue.push("scheduled", "a")
+    interactive = queue.push("interactive", "b")
+    queue.promote(scheduled)
+    assert scheduled["priority"] == "interactive"
+    assert queue.peek(scheduled["enqueued_at"]) is scheduled
+
+    queue.remove(scheduled)
+    queue.promote(interactive, "scheduled")
+    assert interactive["priority"] == "scheduled"
+
+
+@in_loop
+async def test_promote_ignores_served_entries():
+    queue = SearchQueue()
+    entry = queue.push("scheduled")
+    queue.remove(entry)
+    queue.promote(entry)
+    assert entry["priority"] == "scheduled"
+
+
+@in_loop
+async def test_unknown_priority():
+    queue = SearchQueue()
+    with pytest.raises(ValueError):
+        queue.push("urgent")
+    entry = queue.push("scheduled")
+    with pytest.raises(ValueError):
+        queue.promote(entry, "urgent")
+
+
+@in_loop
+async def test_clear_cancels_waiters():
+    queue = SearchQueue()
+    entry = queue.push("interactive")
+    queue.clear()
+    assert entry["future"].cancelled()
+    assert queue.peek() is None
@@ -0,0 +1,189 @@
+"""Tests for the natural-language time expression engine."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from agent.time_expr import TimeExpressionEngine
+
+# Wednesday, 10:00
+NOW = datetime(2026, 10, 14, 10, 0)
+
+WEEKDAY_SPELLINGS = [
+    ("mon", 0), ("monday", 0),
+    ("tue", 1), ("tues", 1), ("tuesday", 1),
+    ("wed", 2), ("wednesday", 2),
+    ("thu", 3), ("thur", 3), ("thurs", 3), ("thursday", 3),
+    ("fri", 4), ("friday", 4),
+    ("sat", 5), ("saturday", 5),
+    ("sun", 6), ("sunday", 6)
+]
+CRON_DAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+
+@pytest.fixture
+def engine():
+    return TimeExpressionEngine()
+
+
+@pytest.mark.parametrize("name,weekday", WEEKDAY_SPELLINGS)
+def test_on_weekday(engine, name, weekday):
+    when = engine.parse(f"on {name} at 9am", NOW)
+    assert when is not None
+    assert when.cron is None
+    assert when.run_date.weekday() == weekday
+    assert (when.run_date.hour, when.run_date.minute) == (9, 0)
+    assert NOW < when.run_date <= NOW + timedelta(days=7)
+
+
+@pytest.mark.parametrize("name,weekday", WEEKDAY_SPELLINGS)
+def test_every_weekday(engine, name, weekday):
+    when = engine.parse(f"every {name} at 9", NOW)
+    assert when is not None
+    assert when.cron == f"0 9 * * {CRON_DAYS[weekday]}"
+    assert when.recurrence == "weekly"
+    assert when.run_date.weekday() == weekday
+    assert when.run_date > NOW
+
+
+@pytest.mark.parametrize("name,weekday", WEEKDAY_SPELLINGS)
+def test_next_weekday(engine, name, weekday):
+    when = engine.parse(f"next {name}", NOW)
+    assert when is not None
+    assert when.run_date.weekday() == weekday
+    assert NOW < when.run_date <= NOW + timedelta(days=7)
+
+
+@pytest.mark.parametrize("name,weekday", WEEKDAY_SPELLINGS)
+def test_split_weekday(engine, name, weekday):
+    query, when = engine.split(f"AI news every {name} at 9am", NOW)
+    assert query == "AI news"
+    assert when.cron == f"0 9 * * {CRON_DAYS[weekday]}"
+
+
+@pytest.mark.parametrize("plural,days", [
+    ("mondays", "mon"),
+    ("wednesdays", "wed"),
+    ("saturdays", "sat"),
+    ("tuesdays and thursdays", "tue,thu")
+])
+def test_plural_weekdays_recur(engine, plural, days):
+    when = engine.parse(f"{plural} at 8am", NOW)
+    assert when.cron == f"0 8 * * {days}"
+
+
+def test_short_weekday_is_not_plural(engine):
+    assert engine.parse("thurs 5pm", NOW).cron is None
+    assert engine.parse("on tues", NOW).cron is None
+
+
+def test_today_with_time(engine):
+    when = engine.parse("today at 3pm", NOW)
+    assert when.run_date == datetime(2026, 10, 14, 15, 0)
+
+
+def test_today_alone_is_immediate(engine):
+    assert engine.parse("today", NOW).immediate
+
+
+def test_tonight(engine):
+    when = engine.parse("tonight", NOW)
+    assert when.run_date == datetime(2026, 10, 14, 21, 0)
+
+
+@pytest.mark.parametrize("phrase,expected", [
+    ("tomorrow at 2pm", datetime(2026, 10, 15, 14, 0)),
+    ("tomorrow morning", datetime(2026, 10, 15, 9, 0)),
+    ("tomorrow at noon", datetime(2026, 10, 15, 12, 0)),
+    ("day after tomorrow at 8:30", datetime(2026, 10, 16, 8, 30))
+])
+def test_tomorrow(engine, phrase, expected):
+    assert engine.parse(phrase, NOW).run_date == expected
+
+
+def test_tomorrow_alone_keeps_time_of_day(engine):
+    assert engine.parse("tomorrow", NOW).run_date == NOW + timedelta(days=1)
+
+
+@pytest.mark.parametrize("phrase,cron,recurrence", [
+    ("every day at 7am", "0 7 * * *", "daily"),
+    ("daily at 18:30", "30 18 * * *", "daily"),
+    ("every morning", "0 9 * * *", "daily"),
+    ("every evening at 6", "0 18 * * *", "daily"),
+    ("every hour", "0 * * * *", "hourly"),
+    ("every 2 hours", "0 */2 * * *", "hourly"),
+    ("every 15 minutes", "*/15 * * * *", "minutely"),
+    ("every weekday at 8am", "0 8 * * mon,tue,wed,thu,fri", "weekly"),
+    ("every weekend at 10", "0 10 * * sat,sun", "weekly"),
+    ("weekly", "0 9 * * wed", "weekly"),
+    ("monthly", "0 9 14 * *", "monthly")
+])
+def test_cron_recurrences(engine, phrase, cron, recurrence):
+    when = engine.parse(phrase, NOW)
+    assert when.cron == cron
+    assert when.recurrence == recurrence
+    assert when.run_date > NOW
+
+
+def test_unknown_phrase(engine):
+    assert engine.parse("whenever you feel like it", NOW) is None
+
+
+def test_split_keeps_numbers_in_query(engine):
+    query, when = engine.split("the top 10 laptops", NOW)
+    assert query == "the top 10 laptops"
+    assert when is None
+
+
+def test_split_one_time(engine):
+    query, when = engine.split("Thales news tomorrow at 2pm", NOW)
+    assert query == "Thales news"
+    assert when.run_date == datetime(2026, 10, 15, 14, 0)
+
+
+def test_bare_weekday_today_means_next_week(engine):
+    assert engine.parse("on wednesday", NOW).run_date == NOW + timedelta(days=7)
+
+
+def test_weekday_today_with_later_time_stays_today(engine):
+    assert engine.parse("wednesday at 3pm", NOW).run_date == datetime(2026, 10, 14, 15, 0)
+
+
+def test_weekday_today_with_earlier_time_rolls_to_next_week(engine):
+    assert engine.parse("wednesday at 9am", NOW).run_date == datetime(2026, 10, 21, 9, 0)
+
+
+def test_explicit_today_in_the_past_is_kept(engine):
+    # Not rolled forward: the caller tells the user the time has passed
+    assert engine.parse("today at 9am", NOW).run_date < NOW
+
+
+@pytest.mark.parametrize("phrase,expected", [
+    ("at 2", (14, 0)),
+    ("at 2:30", (14, 30)),
+    ("at 02:30", (2, 30)),
+    ("at 2:30am", (2, 30)),
+    ("tomorrow morning at 6:15", (6, 15)),
+    ("at 8:30", (8, 30))
+])
+def test_clock_afternoon_assumption(engine, phrase, expected):
+    run = engine.parse(phrase, datetime(2026, 10, 14, 12, 30)).run_date
+    assert (run.hour, run.minute) == expected
+
+
+@pytest.mark.parametrize("phrase,expected", [
+    ("every 2 hours", datetime(2026, 10, 14, 14, 0)),
+    ("every 3 hours", datetime(2026, 10, 14, 15, 0)),
+    ("every hour", datetime(2026, 10, 14, 13, 0)),
+    ("hourly", datetime(2026, 10, 14, 13, 0)),
+    ("every 5 minutes", datetime(2026, 10, 14, 12, 35)),
+    ("every 7 minutes", datetime(2026, 10, 14, 12, 35)),
+    ("every 15 minutes", datetime(2026, 10, 14, 12, 45))
+])
+def test_interval_run_date_matches_cron(engine, phrase, expected):
+    assert engine.parse(phrase, datetime(2026, 10, 14, 12, 31, 20)).run_date == expected
+
+
+@pytest.mark.parametrize("phrase", ["every 90 minutes", "every 30 hours", "every 0 minutes"])
+def test_interval_out_of_cron_range(engine, phrase):
+    assert engine.parse(phrase, NOW) is None
@@ -2,21 +2,149 @@
 
 import asyncio
 import logging
-from typing import Optional, List, Dict, Any
+import os
+import signal
+import statistics
+import time
+from collections import deque
+from typing import Optional, List, Dict, Any, Callable
 from datetime import datetime, timedelta
+from urllib.parse import quote_plus, urlparse, parse_qs
+import ollama
 from browser_use import Browser, Agent
-from langchain_ollama import ChatOllama
+from browser_use.llm.views import ChatInvokeCompletion, ChatInvokeUsage
+
+from agent.ollama_pool import OllamaEndpointPool
+from agent.parser import JSONObjectScanner
+from .quota_ledger import QuotaLedger
+from .rate_limiter import RateLimiter
+from .search_queue import SearchQueue
+from .search_worker import SearchWorker, SearchTimeout
+
+try:
+    import psutil
+except ImportError:  # optional, only needed for memory reporting and process cleanup
+    psutil = None
 
 logger = logging.getLogger(__name__)
 
+SERP_URL = "https://www.google.com/search?q={query}&hl=en&num=10"
+SERP_RESULT_SELECTOR = "#search a h3, #rso a h3"
+# A rendered results page has its result links by DOM ready; anything
+# slower is almost always an interstitial, so fall back to the agent quickly
+SERP_SELECTOR_TIMEOUT = 3.0
+
+# Organic results are the links wrapping an <h3>; the snippet sits in the
+# same result block. Ads, "People also ask" and similar widgets have no h3 link.
+SERP_EXTRACT_JS = """
+(limit) => {
+    const results = [];
+    const seen = new Set();
+    for (const heading of document.querySelectorAll('#search a h3, #rso a h3')) {
+        const link = heading.closest('a');
+        if (!link || !link.href || seen.has(link.href)) continue;
+        seen.add(link.href);
+        const block = link.closest('div.g, div.MjjYud, div[data-hveid]') || link.parentElement;
+        const snippet = block && block.querySelector('div.VwiC3b, div[data-sncf], span.aCOpRe');
+        results.push({
+            title: heading.innerText.trim(),
+            url: link.href,
+            description: snippet ? snippet.innerText.trim() : ''
+        });
+        if (results.length >= limit) break;
+    }
+    return results;
+}
+"""
+
+
+# Lean page profile: no animations, and no ads, iframes or media elements
+# left in the DOM the agent reads
+LEAN_PAGE_JS = """
+(() => {
+    const trim = () => {
+        const style = document.createElement('style');
+        style.textContent = '*, *::before, *::after { animation: none !important; transition: none !important; }';
+        (document.head || document.documentElement).appendChild(style);
+        document.querySelectorAll(
+            'iframe, noscript, video, audio, ins.adsbygoogle, [id^="google_ads"], [aria-label="Advertisement"]'
+        ).forEach((el) => el.remove());
+    };
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', trim, { once: true });
+    } else {
+        trim();
+    }
+})();
+"""
+
+# Transfer size and load time of the current page, from the Performance API
+PAGE_METRICS_JS = """
+() => {
+    const nav = performance.getEntriesByType('navigation')[0];
+    const resources = performance.getEntriesByType('resource');
+    const bytes = resources.reduce((sum, r) => sum + (r.transferSize || 0), nav ? nav.transferSize || 0 : 0);
+    const load = nav ? (nav.loadEventEnd || nav.domContentLoadedEventEnd) - nav.startTime : null;
+    return { bytes, load_ms: load };
+}
+"""
+
+
+class BrowserCrashed(Exception):
+    """The browser instance running a search died or stopped responding."""
+
+
+class SearchBlocked(Exception):
+    """Google answered with a captcha; any retry, the agent included, only prolongs the block."""
+
+
+def normalize_query(query: str) -> str:
+    """Canonical form of a search query: lowercase, single-spaced, no trailing punctuation."""
+    return " ".join(query.lower().split()).strip(" .,!?;:")
+
 
 class OllamaLLMWrapper:
-    """Wrapper for ChatOllama to provide browser_use compatible interface."""
+    """Wrapper around the shared Ollama endpoint pool with a browser_use compatible interface.
     
-    def __init__(self, model: str, temperature: float = 0.1):
-        self._llm = ChatOllama(model=model, temperature=temperature)
+    Built once per BrowserPool and shared by every search; it holds no
+    per-conversation state.
+    """
+    
+    ROLES = frozenset(("system", "user", "assistant"))
+    
+    def __init__(
+        self,
+        model: str,
+        temperature: float = 0.1,
+        keep_alive: Optional[str] = None,
+        pool: Optional[OllamaEndpointPool] = None
+    ):
+        self._owns_pool = pool is None
+        self.pool = pool or OllamaEndpointPool(["http://localhost:11434"])
         self.model = model
+        self.temperature = temperature
+        self.keep_alive = keep_alive
+        self.options = {"temperature": temperature}
         self._provider = "ollama"
+        # Structured output needs Ollama >= 0.5; falls back to JSON mode when rejected
+        self.structured_output = True
+        self._schemas: Dict[type, Dict[str, Any]] = {}
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+    
+    async def close(self):
+        """Close the endpoint pool if the wrapper owns it."""
+        if self._owns_pool:
+            await self.pool.close()
+    
+    def stats(self) -> Dict[str, int]:
+        """Return call and token counters."""
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens
+        }
     
     @property
     def provider(self) -> str:
@@ -31,116 +159,876 @@ class OllamaLLMWrapper:
         return self.model
     
     async def ainvoke(self, messages, output_format=None, **kwargs):
-        """Invoke the LLM with messages."""
-        from browser_use.llm import UserMessage, AssistantMessage, SystemMessage
+        """Invoke the LLM with messages.
         
-        # Convert browser_use messages to LangChain format
-        lc_messages = []
-        for msg in messages:
-            if isinstance(msg, SystemMessage):
-                lc_messages.append({"role": "system", "content": msg.content})
-            elif isinstance(msg, UserMessage):
-                lc_messages.append({"role": "user", "content": msg.content})
-            elif isinstance(msg, AssistantMessage):
-                lc_messages.append({"role": "assistant", "content": msg.content})
+        With an output_format (a pydantic model), Ollama is constrained to
+        the model's JSON schema and the completion is parsed into it, so
+        browser_use gets its action model back instead of free text.
+        """
+        # Convert browser_use messages to Ollama chat format; every browser_use
+        # message carries its role, so no type dispatch is needed
+        ollama_messages = [
+            {"role": msg.role, "content": self._text(msg.content)}
+            for msg in messages
+            if msg.role in self.ROLES
+        ]
         
-        # Call the underlying LLM
-        response = await self._llm.ainvoke(lc_messages)
+        if output_format is None:
+            response = await self._chat(ollama_messages, None)
+            return ChatInvokeCompletion(completion=response['message']['content'] or "", usage=self._usage(response))
         
-        # Return in browser_use format
-        return type('ChatInvokeCompletion', (), {'content': response.content})()
+        try:
+            response = await self._chat(ollama_messages, self._format(output_format))
+        except ollama.ResponseError as e:
+            if not self.structured_output or e.status_code != 400:
+                raise
+            logger.info(f"Ollama rejected schema output ({e}); falling back to JSON mode")
+            self.structured_output = False
+            response = await self._chat(ollama_messages, self._format(output_format))
+        return ChatInvokeCompletion(
+            completion=self._parse(output_format, response['message']['content'] or ""),
+            usage=self._usage(response)
+        )
+    
+    async def _chat(self, ollama_messages: List[Dict[str, str]], output_format: Any):
+        """Call the least loaded Ollama endpoint."""
+        self.calls += 1
+        return await self.pool.call(
+            lambda client: client.chat(
+                model=self.model,
+                messages=ollama_messages,
+                format=output_format,
+                options=self.options,
+                keep_alive=self.keep_alive
+            ),
+            key=f"browser:{self.model}"
+        )
+    
+    def _format(self, output_format: type) -> Any:
+        """Ollama format argument for a pydantic model, caching its schema."""
+        if not self.structured_output:
+            return "json"
+        schema = self._schemas.get(output_format)
+        if schema is None:
+            schema = self._schemas[output_format] = output_format.model_json_schema()
+        return schema
+    
+    @staticmethod
+    def _parse(output_format: type, content: str):
+        """Validate a completion against the model, tolerating text around the JSON."""
+        try:
+            return output_format.model_validate_json(content)
+        except ValueError:
+            scanner = JSONObjectScanner()
+            scanner.feed(content)
+            parsed = scanner.result()
+            if parsed is None:
+                raise
+            return output_format.model_validate(parsed)
+    
+    def _usage(self, response) -> ChatInvokeUsage:
+        """Token usage from Ollama's eval counts."""
+        prompt_tokens = response.get('prompt_eval_count') or 0
+        completion_tokens = response.get('eval_count') or 0
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        return ChatInvokeUsage(
+            prompt_tokens=prompt_tokens,
+            prompt_cached_tokens=None,
+            prompt_cache_creation_tokens=None,
+            prompt_image_tokens=None,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens
+        )
+    
+    @staticmethod
+    def _text(content) -> str:
+        """Flatten browser_use content parts to the plain text Ollama expects."""
+        if content is None or isinstance(content, str):
+            return content or ""
+        return "\n".join(part.text for part in content if getattr(part, "text", None))
 
 
 class BrowserPool:
-    """Manage multiple browser instances with rate limiting."""
+    """Manage long-lived browser instances, each checked out by one search at a time.
+    
+    Modes and tuning are described under "Browser Pool" in the README.
+    """
+    
+    CONTEXT_COOKIES = ("isolated", "shared")
+    DEFAULT_BLOCKED_RESOURCES = ("image", "media", "font")
+    DEFAULT_BLOCKED_HOSTS = (
+        "doubleclick.net", "googlesyndication.com", "googleadservices.com", "google-analytics.com",
+        "googletagmanager.com", "adservice.google.com", "facebook.net", "scorecardresearch.com",
+        "criteo.com", "taboola.com", "outbrain.com", "amazon-adsystem.com", "hotjar.com"
+    )
     
     def __init__(
         self,
         max_instances: int = 3,
+        min_instances: int = 1,
+        idle_timeout: float = 300.0,
         rate_limit_delay: int = 30,
         max_per_day: int = 50,
         headless: bool = True,
-        ollama_model: str = "qwen2.5:7b"
+        ollama_model: str = "qwen2.5:7b",
+        ollama_keep_alive: Optional[str] = None,
+        ollama_pool: Optional[OllamaEndpointPool] = None,
+        launch_timeout: float = 60.0,
+        close_timeout: float = 10.0,
+        rate_limit_burst: int = 1,
+        rate_limit_buckets: Optional[Dict[str, Dict[str, float]]] = None,
+        quota_db_path: str = "storage/scheduler.db",
+        quota_window: str = "calendar",
+        queue_aging: float = 120.0,
+        user_weights: Optional[Dict[str, float]] = None,
+        direct_serp: bool = True,
+        serp_timeout: float = 15.0,
+        max_results: int = 5,
+        block_resources: Optional[List[str]] = None,
+        block_hosts: Optional[List[str]] = None,
+        lean_pages: bool = True,
+        recycle_after: int = 100,
+        max_rss_mb: Optional[float] = 1024,
+        health_interval: float = 60.0,
+        probe_timeout: float = 10.0,
+        contexts_per_browser: int = 1,
+        context_cookies: str = "isolated",
+        worker_processes: bool = False,
+        search_timeout: float = 180.0
     ):
+        if context_cookies not in self.CONTEXT_COOKIES:
+            raise ValueError(f"Unknown context cookie mode: {context_cookies!r}")
         self.max_instances = max_instances
+        self.worker_processes = worker_processes
+        self.search_timeout = search_timeout
+        # Workers run one browser each, so contexts only apply in-process
+        self.contexts_per_browser = 1 if worker_processes else max(int(contexts_per_browser), 1)
+        self.context_cookies = context_cookies
+        # Shared browsers that context slots live in (contexts mode only)
+        self.hosts: List[Optional[Browser]] = []
+        self._host_locks: List[asyncio.Lock] = []
+        self.min_instances = min(min_instances, max_instances)
+        self.idle_timeout = idle_timeout
+        self.scale_ups = 0
+        self.reaped = 0
+        # instance index -> task launching a stopped slot
+        self._starting: Dict[int, asyncio.Task] = {}
+        self._reap_task: Optional[asyncio.Task] = None
         self.rate_limit_delay = rate_limit_delay
         self.max_per_day = max_per_day
         self.headless = headless
         self.ollama_model = ollama_model
+        self.ollama_keep_alive = ollama_keep_alive
+        self.ollama_pool = ollama_pool
+        self.launch_timeout = launch_timeout
+        self.close_timeout = close_timeout
+        self.direct_serp = direct_serp
+        self.serp_timeout = serp_timeout
+        self.max_results = max_results
+        # Search latency by path: "serp" (DOM extraction) or "agent" (LLM-driven)
+        self.path_latencies: Dict[str, deque] = {"serp": deque(maxlen=200), "agent": deque(maxlen=200)}
+        self.serp_fallbacks = 0
+        self.block_resources = frozenset(
+            self.DEFAULT_BLOCKED_RESOURCES if block_resources is None else block_resources
+        )
+        self.block_hosts = tuple(self.DEFAULT_BLOCKED_HOSTS if block_hosts is None else block_hosts)
+        self.lean_pages = lean_pages
+        self.blocked_requests = 0
+        self.page_bytes: deque = deque(maxlen=200)
+        self.page_load_times: deque = deque(maxlen=200)
+        self.recycle_after = recycle_after
+        self.max_rss_mb = max_rss_mb
+        self.health_interval = health_interval
+        self.probe_timeout = probe_timeout
+        self.recycles = 0
+        self.crashes = 0
+        self._health_task: Optional[asyncio.Task] = None
+        # instance index -> task closing and relaunching it
+        self._recycling: Dict[int, asyncio.Task] = {}
+        # One wrapper for every search, sharing the pool's HTTP connections
+        self.llm = OllamaLLMWrapper(
+            model=ollama_model,
+            temperature=0.1,
+            keep_alive=ollama_keep_alive,
+            pool=ollama_pool
+        )
+        self.setup_times: deque = deque(maxlen=200)
         
-        self.semaphore = asyncio.Semaphore(max_instances)
-        self.rate_limit_lock = asyncio.Lock()
-        self.last_search_time: Optional[datetime] = None
-        self.daily_count = 0
-        self.daily_reset = datetime.now()
-        
-        self.browsers: List[Browser] = []
+        # Slots are booked by the dispatcher just before a browser is handed out
+        self.rate_limiter = RateLimiter(rate_limit_delay, rate_limit_burst, rate_limit_buckets)
+        # The daily budget is persisted so restarts don't reset it
+        self.quota = QuotaLedger(quota_db_path, limit=max_per_day, window=quota_window)
         
+        self.browsers: List[Optional[Browser]] = []
+        self.instance_stats: List[Dict[str, Any]] = []
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self.queue = SearchQueue(aging=queue_aging, user_weights=user_weights)
+        self._dispatch_timer: Optional[asyncio.TimerHandle] = None
+        self.checkout_waits: deque = deque(maxlen=200)
+        # normalized query -> {"task", "waiters"} for searches in progress
+        self._in_flight: Dict[str, Dict[str, Any]] = {}
+        self.coalesced = 0
+    
     async def initialize(self):
-        """Initialize browser instances."""
-        logger.info(f"Initializing {self.max_instances} browser instances...")
-        for i in range(self.max_instances):
-            browser = Browser(headless=self.headless)
-            self.browsers.append(browser)
-            logger.info(f"Browser instance {i+1} initialized")
+        """Launch the minimum number of browsers so the first search doesn't wait for Chromium."""
+        logger.info(f"Initializing {self.min_instances} of up to {self.max_instances} browser instances...")
+        for _ in range(self.max_instances):
+            self.browsers.append(None)
+            self.instance_stats.append(
+                {
+                    "searches": 0, "uses": 0, "launch_seconds": None, "pid": None, "busy": False,
+                    "recycling": False, "affinity": set(), "profiled": False, "recycles": 0, "crashes": 0,
+                    "idle_since": None, "host": None
+                }
+            )
+        if self.contexts_per_browser > 1:
+            hosts = -(-self.max_instances // self.contexts_per_browser)
+            self.hosts = [None] * hosts
+            self._host_locks = [asyncio.Lock() for _ in range(hosts)]
+        await asyncio.gather(*(self._launch(i) for i in range(self.min_instances)))
+        for i in range(self.min_instances):
+            self._make_idle(i)
+        if self.health_interval > 0:
+            self._health_task = asyncio.create_task(self._health_loop())
+        if self.min_instances < self.max_instances and self.idle_timeout > 0:
+            self._reap_task = asyncio.create_task(self._reap_loop())
     
-    async def cleanup(self):
-        """Close all browser instances."""
-        logger.info("Cleaning up browser instances...")
-        for browser in self.browsers:
+    async def _new_session(self, index: int) -> Browser:
+        """A browser session for a slot: a worker, a context in a host browser, or its own process."""
+        if self.worker_processes:
+            return SearchWorker(self._worker_config(), grace=self.close_timeout / 2)
+        if self.contexts_per_browser > 1:
             try:
-                # BrowserSession doesn't have close(), just stop using it
-                pass
+                return await self._context_session(index)
             except Exception as e:
-                logger.error(f"Error closing browser: {e}")
+                logger.error(f"Browser instance {index + 1} could not open a context, using its own browser: {e}")
+        # keep_alive stops Agent.run() from closing the session after each search
+        return Browser(headless=self.headless, keep_alive=True)
+    
+    def _worker_config(self) -> Dict[str, Any]:
+        """BrowserPool settings a search worker needs to search the same way."""
+        return {
+            "headless": self.headless,
+            "ollama_model": self.ollama_model,
+            "ollama_keep_alive": self.ollama_keep_alive,
+            "ollama_urls": (
+                [endpoint.url for endpoint in self.ollama_pool.endpoints]
+                if self.ollama_pool else ["http://localhost:11434"]
+            ),
+            "launch_timeout": self.launch_timeout,
+            "close_timeout": self.close_timeout,
+            "quota_db_path": self.quota.db_path,
+            "direct_serp": self.direct_serp,
+            "serp_timeout": self.serp_timeout,
+            "max_results": self.max_results,
+            "block_resources": sorted(self.block_resources),
+            "block_hosts": list(self.block_hosts),
+            "lean_pages": self.lean_pages
+        }
+    
+    async def _context_session(self, index: int) -> Browser:
+        host_index = index // self.contexts_per_browser
+        async with self._host_locks[host_index]:
+            host = await self._ensure_host(host_index)
+            context = await host.browser.new_context()
+            self.instance_stats[index]["host"] = host_index
+        if self.context_cookies == "shared":
+            sibling = next(
+                (
+                    browser for i, browser in enumerate(self.browsers)
+                    if i != index and browser is not None and self.instance_stats[i]["host"] == host_index
+                ),
+                None
+            )
+            if sibling is not None:
+                await context.add_cookies(await sibling.browser_context.cookies())
+        return Browser(browser_context=context, keep_alive=True)
+    
+    async def _ensure_host(self, host_index: int) -> Browser:
+        """Return the running host browser, launching or relaunching it if needed."""
+        host = self.hosts[host_index]
+        if host is not None:
+            pid = self._pid(host)
+            if getattr(host, "browser", None) is not None and (pid is None or self._alive(pid)):
+                return host
+            logger.warning(f"Browser host {host_index + 1} is gone, relaunching it")
+            await self._close_session(host, pid, f"Browser host {host_index + 1}")
+            self.hosts[host_index] = None
+        # No user_data_dir: a plain browser that can hold several contexts
+        host = Browser(headless=self.headless, keep_alive=True, user_data_dir=None)
+        started = time.monotonic()
+        await asyncio.wait_for(host.start(), timeout=self.launch_timeout)
+        self.hosts[host_index] = host
+        logger.info(
+            f"Browser host {host_index + 1} launched in {time.monotonic() - started:.1f}s (pid {self._pid(host)})"
+        )
+        return host
+    
+    async def _stop_host_if_unused(self, host_index: int):
+        async with self._host_locks[host_index]:
+            host = self.hosts[host_index]
+            in_use = any(
+                info["host"] == host_index and self.browsers[i] is not None
+                for i, info in enumerate(self.instance_stats)
+            ) or any(i // self.contexts_per_browser == host_index for i in self._starting)
+            if host is None or in_use:
+                return
+            logger.info(f"Stopping browser host {host_index + 1}, none of its contexts are running")
+            self.hosts[host_index] = None
+            await self._close_session(host, self._pid(host), f"Browser host {host_index + 1}")
+    
+    async def cleanup(self):
+        """Close all browser instances, killing any that hang."""
+        logger.info("Cleaning up browser instances...")
+        if self._dispatch_timer:
+            self._dispatch_timer.cancel()
+            self._dispatch_timer = None
+        self.queue.clear()
+        tasks = [
+            task for task in (self._health_task, self._reap_task, *self._recycling.values(), *self._starting.values())
+            if task
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._health_task = None
+        self._reap_task = None
+        self._recycling.clear()
+        self._starting.clear()
+        await asyncio.gather(
+            *(self._close(i) for i, browser in enumerate(self.browsers) if browser is not None)
+        )
+        await asyncio.gather(
+            *(
+                self._close_session(host, self._pid(host), f"Browser host {i + 1}")
+                for i, host in enumerate(self.hosts) if host is not None
+            )
+        )
+        self.hosts.clear()
         self.browsers.clear()
+        self.instance_stats.clear()
+        self._idle = asyncio.Queue()
+        await self.llm.close()
         logger.info("Browser cleanup complete")
     
-    async def _check_daily_limit(self) -> bool:
-        """Check if daily search limit reached."""
-        now = datetime.now()
+    def stats(self) -> Dict[str, Any]:
+        """Return per-instance process id, memory and usage, and checkout wait times."""
+        return {
+            "instances": [
+                {
+                    "index": i,
+                    "pid": info["pid"],
+                    # Context slots share their host's memory, reported under "hosts"
+                    "rss": self._rss(info["pid"]) if info["host"] is None else None,
+                    "host": info["host"],
+                    "searches": info["searches"],
+                    "busy": info["busy"],
+                    "recycling": info["recycling"],
+                    "affinity": sorted(info["affinity"]),
+                    "launch_seconds": info["launch_seconds"],
+                    "recycles": info["recycles"],
+                    "crashes": info["crashes"]
+                }
+                for i, info in enumerate(self.instance_stats)
+                if self.browsers[i] is not None
+            ],
+            "hosts": [
+                {
+                    "index": i,
+                    "pid": self._pid(host),
+                    "rss": self._rss(self._pid(host)),
+                    "contexts": sum(
+                        1 for j, info in enumerate(self.instance_stats)
+                        if info["host"] == i and self.browsers[j] is not None
+                    )
+                }
+                for i, host in enumerate(self.hosts) if host is not None
+            ],
+            "max_instances": self.max_instances,
+            "workers": self.worker_processes,
+            "starting": len(self._starting),
+            "scale_ups": self.scale_ups,
+            "reaped": self.reaped,
+            "idle": self._idle.qsize(),
+            "in_flight": len(self._in_flight),
+            "coalesced": self.coalesced,
+            "recycles": self.recycles,
+            "crashes": self.crashes,
+            "queue": self.queue.stats(),
+            "p50_wait": statistics.median(self.checkout_waits) if self.checkout_waits else None,
+            "max_wait": max(self.checkout_waits) if self.checkout_waits else None,
+            "p50_setup": statistics.median(self.setup_times) if self.setup_times else None,
+            "paths": {
+                path: {
+                    "searches": len(latencies),
+                    "p50_latency": statistics.median(latencies) if latencies else None
+                }
+                for path, latencies in self.path_latencies.items()
+            },
+            "serp_fallbacks": self.serp_fallbacks,
+            "pages": {
+                "blocked_requests": self.blocked_requests,
+                "p50_bytes": statistics.median(self.page_bytes) if self.page_bytes else None,
+                "p50_load": statistics.median(self.page_load_times) if self.page_load_times else None
+            }
+        }
+    
+    async def checkout(
+        self,
+        affinity: Optional[str] = None,
+        priority: str = "interactive",
+        user_id: Optional[str] = None,
+        rate_key: Optional[str] = None,
+        flight: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """Wait for an idle browser and return its index, preferring one with the affinity.
         
-        # Reset counter if it's a new day
-        if now.date() > self.daily_reset.date():
-            self.daily_count = 0
-            self.daily_reset = now
-            logger.info("Daily search counter reset")
+        With a rate_key, the browser is only handed out once that key's
+        rate-limit slot is due. A shared search's flight gets the queue
+        entry, so a more urgent caller joining it can promote the wait.
+        """
+        started = time.monotonic()
+        entry = self.queue.push(priority, user_id, affinity=affinity, rate_key=rate_key, blocked_since=None)
+        if flight is not None:
+            flight["entry"] = entry
+        self._dispatch()
+        try:
+            index = await entry["future"]
+        except asyncio.CancelledError:
+            # Cancelled right after being served: give the browser back
+            if entry["future"].done() and not entry["future"].cancelled():
+                self.checkin(entry["future"].result())
+            raise
+        self.checkout_waits.append(time.monotonic() - started)
+        self.instance_stats[index]["busy"] = True
+        return index
+    
+    def checkin(self, index: int, affinity: Optional[str] = None):
+        """Return a browser to the idle queue, recording the affinity it gained.
         
-        if self.daily_count >= self.max_per_day:
-            logger.warning(f"Daily search limit ({self.max_per_day}) reached")
-            return False
+        An instance that is due for recycling is relaunched first and only
+        goes back to the idle queue once it is up again.
+        """
+        info = self.instance_stats[index]
+        info["busy"] = False
+        if affinity:
+            info["affinity"].add(affinity)
+        reason = self._recycle_reason(index)
+        if reason:
+            self._start_recycle(index, reason)
+            return
+        self._make_idle(index)
+    
+    def _make_idle(self, index: int):
+        self.instance_stats[index]["idle_since"] = time.monotonic()
+        self._idle.put_nowait(index)
+        self._dispatch()
+    
+    def _dispatch(self):
+        """Hand idle browsers to waiting searches in queue order."""
+        if self._dispatch_timer:
+            self._dispatch_timer.cancel()
+            self._dispatch_timer = None
+        while not self._idle.empty():
+            entry = self.queue.peek()
+            if entry is None:
+                return
+            now = time.monotonic()
+            if entry["rate_key"]:
+                delay = self.rate_limiter.delay(entry["rate_key"], now)
+                if delay > 0:
+                    # Come back when the slot is due; whoever is first then gets it
+                    entry["blocked_since"] = entry["blocked_since"] or now
+                    self._dispatch_timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                    return
+                self.rate_limiter.reserve(entry["rate_key"], now, waited=now - (entry["blocked_since"] or now))
+            self.queue.remove(entry, now)
+            entry["future"].set_result(self._take_idle(entry["affinity"]))
         
+        # Every running instance is busy: start stopped slots for the searches still waiting
+        if self.queue.peek() is None:
+            return
+        waiting = len(self.queue) - len(self._starting)
+        for index, browser in enumerate(self.browsers):
+            if waiting <= 0:
+                break
+            if browser is None and index not in self._starting:
+                self._starting[index] = asyncio.create_task(self._spawn(index))
+                waiting -= 1
+    
+    async def _spawn(self, index: int):
+        """Launch a stopped slot on demand and make it idle."""
+        running = sum(1 for browser in self.browsers if browser is not None) + 1
+        logger.info(f"Scaling browser pool up to {running} instances ({len(self.queue)} searches waiting)")
+        self._reset_instance(index)
+        try:
+            await self._launch(index)
+        finally:
+            self._starting.pop(index, None)
+        self.scale_ups += 1
+        self._make_idle(index)
+    
+    async def _reap_loop(self):
+        while True:
+            await asyncio.sleep(max(self.idle_timeout / 4, 1.0))
+            now = time.monotonic()
+            running = sum(1 for browser in self.browsers if browser is not None)
+            for index, browser in enumerate(self.browsers):
+                if running <= self.min_instances:
+                    break
+                info = self.instance_stats[index]
+                if browser is None or info["busy"] or info["recycling"] or info["idle_since"] is None:
+                    continue
+                if now - info["idle_since"] >= self.idle_timeout and self._remove_idle(index):
+                    logger.info(f"Stopping browser instance {index + 1} after {now - info['idle_since']:.0f}s idle")
+                    running -= 1
+                    self.reaped += 1
+                    host = info["host"]
+                    await self._close(index)
+                    self.browsers[index] = None
+                    self._reset_instance(index)
+                    # A search that queued meanwhile can launch this slot again
+                    self._dispatch()
+                    if host is not None:
+                        await self._stop_host_if_unused(host)
+    
+    def _reset_instance(self, index: int):
+        self.instance_stats[index].update(
+            uses=0, launch_seconds=None, pid=None, profiled=False, affinity=set(), idle_since=None, host=None
+        )
+    
+    def _take_idle(self, affinity: Optional[str]) -> int:
+        """Take an idle instance, preferring one that already has the affinity."""
+        idle = []
+        while not self._idle.empty():
+            idle.append(self._idle.get_nowait())
+        index = next((i for i in idle if affinity in self.instance_stats[i]["affinity"]), idle[0])
+        for other in idle:
+            if other != index:
+                self._idle.put_nowait(other)
+        return index
+    
+    def _recycle_reason(self, index: int) -> Optional[str]:
+        """Why an instance should be replaced, or None if it is fine."""
+        info = self.instance_stats[index]
+        if info["pid"] is not None and not self._alive(info["pid"]):
+            return "crashed"
+        if self.recycle_after and info["uses"] >= self.recycle_after:
+            return f"{info['uses']} searches"
+        if self.max_rss_mb and info["host"] is None:
+            rss = self._rss(info["pid"])
+            if rss is not None and rss > self.max_rss_mb * 2**20:
+                return f"{rss / 2**20:.0f} MB RSS"
+        return None
+    
+    def _start_recycle(self, index: int, reason: str):
+        if index not in self._recycling:
+            self.instance_stats[index]["recycling"] = True
+            self._recycling[index] = asyncio.create_task(self._recycle(index, reason))
+    
+    async def _recycle(self, index: int, reason: str):
+        """Close an instance and launch a fresh one in its place, then make it idle."""
+        info = self.instance_stats[index]
+        crashed = reason in ("crashed", "unresponsive")
+        if crashed:
+            self.crashes += 1
+            info["crashes"] += 1
+            logger.warning(f"Browser instance {index + 1} {reason}, respawning")
+        else:
+            self.recycles += 1
+            info["recycles"] += 1
+            logger.info(f"Recycling browser instance {index + 1} after {reason}")
+        try:
+            await self._close(index)
+            self._reset_instance(index)
+            await self._launch(index)
+        finally:
+            info["recycling"] = False
+            self._recycling.pop(index, None)
+        self._make_idle(index)
+    
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for index, browser in enumerate(self.browsers):
+                info = self.instance_stats[index]
+                if browser is None or info["busy"] or info["recycling"]:
+                    continue
+                reason = self._recycle_reason(index) or await self._probe(index)
+                # Only recycle it if no search took it while it was being probed
+                if reason and self._remove_idle(index):
+                    self._start_recycle(index, reason)
+    
+    async def _probe(self, index: int) -> Optional[str]:
+        """Round-trip to the browser; returns "unresponsive" if it doesn't answer."""
+        browser = self.browsers[index]
+        if isinstance(browser, SearchWorker):
+            probe = browser.ping()
+        elif getattr(browser, "browser_context", None) is not None:
+            probe = browser.browser_context.cookies()
+        else:
+            return None
+        try:
+            await asyncio.wait_for(probe, timeout=self.probe_timeout)
+        except Exception as e:
+            logger.warning(f"Health probe failed for browser instance {index + 1}: {e!r}")
+            return "unresponsive"
+        return None
+    
+    def _remove_idle(self, index: int) -> bool:
+        """Take a specific instance off the idle queue; False if it wasn't idle."""
+        idle = []
+        while not self._idle.empty():
+            idle.append(self._idle.get_nowait())
+        for other in idle:
+            if other != index:
+                self._idle.put_nowait(other)
+        return index in idle
+    
+    async def _launch(self, index: int):
+        info = self.instance_stats[index]
+        started = time.monotonic()
+        browser = self.browsers[index] = await self._new_session(index)
+        try:
+            await asyncio.wait_for(browser.start(), timeout=self.launch_timeout)
+        except Exception as e:
+            # The session starts lazily on first use instead
+            logger.error(f"Browser instance {index + 1} failed to launch: {e}")
+            return
+        info["launch_seconds"] = time.monotonic() - started
+        if info["host"] is not None:
+            info["pid"] = self._pid(self.hosts[info["host"]])
+        else:
+            info["pid"] = self._pid(browser)
+        logger.info(f"Browser instance {index + 1} launched in {info['launch_seconds']:.1f}s (pid {info['pid']})")
+        await self._apply_profile(index)
+    
+    async def _apply_profile(self, index: int):
+        """Install request blocking and the lean page script on an instance's context."""
+        info = self.instance_stats[index]
+        context = getattr(self.browsers[index], "browser_context", None)
+        if info["profiled"] or context is None:
+            return
+        try:
+            if self.block_resources or self.block_hosts:
+                await context.route("**/*", self._route)
+            if self.lean_pages:
+                await context.add_init_script(LEAN_PAGE_JS)
+        except Exception as e:
+            logger.warning(f"Could not apply page profile to browser instance {index + 1}: {e}")
+            return
+        info["profiled"] = True
+    
+    async def _route(self, route):
+        request = route.request
+        if request.resource_type in self.block_resources or self._blocked_host(request.url):
+            self.blocked_requests += 1
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    def _blocked_host(self, url: str) -> bool:
+        host = urlparse(url).hostname or ""
+        return any(host == blocked or host.endswith("." + blocked) for blocked in self.block_hosts)
+    
+    async def _close(self, index: int):
+        browser = self.browsers[index]
+        info = self.instance_stats[index]
+        if info["host"] is not None:
+            # The process is shared, so only this slot's context goes
+            try:
+                await asyncio.wait_for(browser.browser_context.close(), timeout=self.close_timeout)
+            except Exception as e:
+                logger.warning(f"Browser instance {index + 1} context did not close cleanly: {e!r}")
+            return
+        await self._close_session(browser, self._pid(browser) or info["pid"], f"Browser instance {index + 1}")
+    
+    async def _close_session(self, browser: Browser, pid: Optional[int], name: str):
+        try:
+            # kill() closes the session even though keep_alive is set
+            await asyncio.wait_for(browser.kill(), timeout=self.close_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{name} did not close within {self.close_timeout:.0f}s")
+        except Exception as e:
+            logger.warning(f"{name} did not close cleanly: {e}")
+        if pid and self._alive(pid):
+            logger.warning(f"Killing {name.lower()} (pid {pid})")
+            self._kill_process_tree(pid)
+    
+    @staticmethod
+    def _pid(browser: Browser) -> Optional[int]:
+        """Process id of the locally launched Chromium or search worker, if any."""
+        if isinstance(browser, SearchWorker):
+            return browser.pid
+        return getattr(browser, "browser_pid", None)
+    
+    @staticmethod
+    def _alive(pid: int) -> bool:
+        if psutil is not None:
+            return psutil.pid_exists(pid)
+        try:
+            os.kill(pid, 0)
+        except OSError:
+            return False
         return True
     
-    async def _enforce_rate_limit(self):
-        """Wait if needed to respect rate limit."""
-        async with self.rate_limit_lock:
-            if self.last_search_time:
-                elapsed = (datetime.now() - self.last_search_time).total_seconds()
-                if elapsed < self.rate_limit_delay:
-                    wait_time = self.rate_limit_delay - elapsed
-                    logger.info(f"Rate limiting: waiting {wait_time:.1f}s")
-                    await asyncio.sleep(wait_time)
-            
-            self.last_search_time = datetime.now()
-            self.daily_count += 1
+    @staticmethod
+    def _rss(pid: Optional[int]) -> Optional[int]:
+        """Resident memory in bytes of a browser and its renderer/GPU children."""
+        if pid is None or psutil is None:
+            return None
+        try:
+            process = psutil.Process(pid)
+            processes = [process] + process.children(recursive=True)
+        except psutil.Error:
+            return None
+        total = 0
+        for proc in processes:
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+    
+    @staticmethod
+    def _kill_process_tree(pid: int):
+        if psutil is None:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except OSError:
+                pass
+            return
+        try:
+            process = psutil.Process(pid)
+            processes = process.children(recursive=True) + [process]
+        except psutil.Error:
+            return
+        for proc in processes:
+            try:
+                proc.kill()
+            except psutil.Error:
+                pass
+        psutil.wait_procs(processes, timeout=5)
+    
+    async def search(
+        self,
+        query: str,
+        priority: str = "interactive",
+        user_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Perform Google search with rate limiting.
+        
+        Concurrent calls for the same normalized query share one search,
+        queued with the most urgent caller's priority. Cancelling one caller
+        leaves the search running for the others; it is only cancelled once
+        every caller has gone.
+        """
+        key = normalize_query(query)
+        flight = self._in_flight.get(key)
+        if flight is None:
+            # "entry" is the search's place in the browser queue while it waits
+            flight = {"waiters": 0, "priority": priority, "entry": None}
+            flight["task"] = asyncio.create_task(self._search_once(query, flight, user_id))
+            self._in_flight[key] = flight
+            flight["task"].add_done_callback(
+                lambda _: self._in_flight.pop(key) if self._in_flight.get(key) is flight else None
+            )
+        else:
+            self.coalesced += 1
+            logger.info(f"Joining in-flight search for '{query}'")
+            if priority == "interactive" and flight["priority"] != "interactive":
+                flight["priority"] = priority
+                if flight["entry"] is not None:
+                    self.queue.promote(flight["entry"], priority)
+        
+        flight["waiters"] += 1
+        try:
+            return await asyncio.shield(flight["task"])
+        finally:
+            flight["waiters"] -= 1
+            if flight["waiters"] == 0 and not flight["task"].done():
+                flight["task"].cancel()
+    
+    async def run_search(
+        self,
+        query: str,
+        on_article: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """Run one search on this pool's browsers, without quota or single-flight.
+        
+        Used by search worker processes, whose parent pool does both. Each
+        article is also passed to on_article as soon as it is found.
+        """
+        return await self._search_with_browser(query, "interactive", None, on_article=on_article)
     
-    async def search(self, query: str) -> List[Dict[str, Any]]:
-        """Perform Google search with rate limiting."""
-        if not await self._check_daily_limit():
+    async def _search_once(self, query: str, flight: Dict[str, Any], user_id: Optional[str]) -> List[Dict[str, Any]]:
+        """Spend one quota slot and run a search."""
+        if not self.browsers:
+            raise Exception("Browser pool is not initialized")
+        reservation = self.quota.reserve()
+        if reservation is None:
+            logger.warning(f"Daily search limit ({self.max_per_day}) reached")
             raise Exception("Daily search limit reached")
         
-        async with self.semaphore:
-            await self._enforce_rate_limit()
-            
-            # Round-robin browser selection
-            browser_idx = self.daily_count % len(self.browsers)
+        committed = False
+        try:
+            try:
+                articles = await self._search_with_browser(query, flight["priority"], user_id, flight)
+            except BrowserCrashed as e:
+                logger.warning(f"Retrying '{query}' on another browser: {e}")
+                articles = await self._search_with_browser(query, flight["priority"], user_id, flight)
+            self.quota.commit(reservation)
+            committed = True
+            return articles
+        finally:
+            if not committed:
+                # Failed or cancelled searches give their budget back
+                self.quota.refund(reservation)
+    
+    async def _search_with_browser(
+        self,
+        query: str,
+        priority: str,
+        user_id: Optional[str],
+        flight: Optional[Dict[str, Any]] = None,
+        on_article: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """Search on a checked-out browser: read the results page directly, else run the agent."""
+        browser_idx = await self.checkout(
+            affinity="google",
+            priority=priority,
+            user_id=user_id,
+            rate_key="google",
+            flight=flight
+        )
+        try:
             browser = self.browsers[browser_idx]
+            self.instance_stats[browser_idx]["searches"] += 1
+            self.instance_stats[browser_idx]["uses"] += 1
+            if self.worker_processes:
+                return await self._search_in_worker(browser, query)
+            # Sessions that started lazily get their profile on first use
+            await self._apply_profile(browser_idx)
+            
+            if self.direct_serp:
+                started = time.monotonic()
+                articles = await self._extract_serp(browser, query, on_article)
+                if articles:
+                    self.path_latencies["serp"].append(time.monotonic() - started)
+                    logger.info(f"Search completed: found {len(articles)} articles for '{query}'")
+                    return articles
+                self.serp_fallbacks += 1
+                if articles is not None:
+                    # The results page used this search's rate-limit slot; the agent goes back to Google
+                    delay = self.rate_limiter.reserve("google")
+                    if delay > 0:
+                        logger.info(f"Rate limiting google: waiting {delay:.1f}s before the agent searches '{query}'")
+                        await asyncio.sleep(delay)
             
             try:
-                # Use browser_use Agent to perform search
-                from browser_use import Agent
-                
+                started = time.monotonic()
+                setup_started = time.monotonic()
                 task = f"""Search Google for "{query}" and extract information about the top 5 results.
                 For each result, provide:
                 1. Title of the page
@@ -149,15 +1037,20 @@ class BrowserPool:
                 
                 Return the results in a structured format."""
                 
-                # Use wrapped LLM that provides browser_use compatible interface
-                llm = OllamaLLMWrapper(model=self.ollama_model, temperature=0.1)
-                agent = Agent(task=task, llm=llm, browser=browser)
+                agent = Agent(task=task, llm=self.llm, browser=browser)
+                self.setup_times.append(time.monotonic() - setup_started)
                 
                 # Run the agent
                 result = await agent.run()
+                if self.instance_stats[browser_idx]["pid"] is None:
+                    self.instance_stats[browser_idx]["pid"] = self._pid(browser)
                 
                 # Parse results from agent output
                 articles = self._parse_search_results(result, query)
+                if on_article:
+                    for article in articles:
+                        on_article(article)
+                self.path_latencies["agent"].append(time.monotonic() - started)
                 
                 logger.info(f"Search completed: found {len(articles)} articles for '{query}'")
                 return articles
@@ -165,6 +1058,137 @@ class BrowserPool:
             except Exception as e:
                 logger.error(f"Search failed for '{query}': {e}")
                 raise
+        except SearchTimeout:
+            # Its worker is gone, but the search itself is what hung: don't retry it
+            raise
+        except Exception as e:
+            pid = self.instance_stats[browser_idx]["pid"]
+            if pid is not None and not self._alive(pid):
+                raise BrowserCrashed(f"browser instance {browser_idx + 1} died") from e
+            raise
+        finally:
+            self.checkin(browser_idx, affinity="google")
+    
+    async def _search_in_worker(self, worker: SearchWorker, query: str) -> List[Dict[str, Any]]:
+        """Run a search in a worker process, folding its timings and LLM usage into ours."""
+        try:
+            reply = await worker.search(query, timeout=self.search_timeout)
+        except SearchTimeout as e:
+            if not e.articles:
+                raise
+            logger.warning(f"Search for '{query}' timed out; keeping the {len(e.articles)} articles it found")
+            return e.articles
+        self.path_latencies[reply["path"]].append(reply["seconds"])
+        if reply["path"] == "agent" and self.direct_serp:
+            self.serp_fallbacks += 1
+        # The worker doesn't rate limit; book the Google visits beyond the slot this checkout took
+        for _ in range(reply["google_requests"] - 1):
+            self.rate_limiter.reserve("google")
+        self.llm.calls += reply["llm"]["calls"]
+        self.llm.prompt_tokens += reply["llm"]["prompt_tokens"]
+        self.llm.completion_tokens += reply["llm"]["completion_tokens"]
+        logger.info(f"Search completed: found {len(reply['articles'])} articles for '{query}'")
+        return reply["articles"]
+    
+    async def _extract_serp(
+        self,
+        browser: Browser,
+        query: str,
+        on_article: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """Load the results page in a new tab and read the organic results from the DOM.
+        
+        Returns an empty list when the page can't be used (no Playwright
+        context yet, consent or captcha page, changed markup), which sends
+        the search to the agent instead, or None if the page was never
+        requested. Raises SearchBlocked on a captcha. Articles go to
+        on_article before the tab is cleaned up.
+        """
+        context = getattr(browser, "browser_context", None)
+        if context is None:
+            return None
+        page = None
+        try:
+            page = await context.new_page()
+            await page.goto(
+                SERP_URL.format(query=quote_plus(query)),
+                wait_until="domcontentloaded",
+                timeout=self.serp_timeout * 1000
+            )
+            block = await self._serp_block(page)
+            if block == "captcha":
+                raise SearchBlocked(f"Google answered '{query}' with a captcha")
+            if block == "consent":
+                logger.info(f"Got a consent page for '{query}', using the agent")
+                return []
+            await page.wait_for_selector(
+                SERP_RESULT_SELECTOR,
+                timeout=min(self.serp_timeout, SERP_SELECTOR_TIMEOUT) * 1000
+            )
+            articles = self._serp_articles(await page.evaluate(SERP_EXTRACT_JS, self.max_results), query)
+            if on_article:
+                for article in articles:
+                    on_article(article)
+            await self._record_page_metrics(page)
+        except SearchBlocked:
+            raise
+        except Exception as e:
+            logger.info(f"Results page extraction failed for '{query}', using the agent: {e}")
+            return []
+        finally:
+            if page is not None:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+        return articles
+    
+    def _serp_articles(self, results: List[Dict[str, str]], query: str) -> List[Dict[str, Any]]:
+        """Turn extracted results into articles, skipping ones without a usable link or title."""
+        retrieved_at = datetime.now().isoformat()
+        articles = []
+        for result in results:
+            url = self._unwrap_redirect(result["url"])
+            if not url.startswith(("http://", "https://")) or not result["title"]:
+                continue
+            articles.append({
+                "title": result["title"],
+                "url": url,
+                "description": result["description"],
+                "source_query": query,
+                "retrieved_at": retrieved_at
+            })
+        return articles
+    
+    @staticmethod
+    async def _serp_block(page) -> Optional[str]:
+        """Return "captcha" or "consent" if Google answered with that page instead of results."""
+        url = urlparse(page.url)
+        if url.path.startswith("/sorry/") or await page.query_selector("#captcha-form") is not None:
+            return "captcha"
+        if url.netloc.startswith("consent.") or await page.query_selector("form[action*='consent']") is not None:
+            return "consent"
+        return None
+    
+    async def _record_page_metrics(self, page):
+        """Record the page's transfer size and load time."""
+        try:
+            metrics = await page.evaluate(PAGE_METRICS_JS)
+        except Exception:
+            return
+        self.page_bytes.append(metrics["bytes"])
+        if metrics["load_ms"] is not None:
+            self.page_load_times.append(metrics["load_ms"] / 1000)
+    
+    @staticmethod
+    def _unwrap_redirect(url: str) -> str:
+        """Turn a google.com/url?q=... redirect into its target."""
+        parsed = urlparse(url)
+        if parsed.netloc.endswith("google.com") and parsed.path == "/url":
+            target = parse_qs(parsed.query).get("q") or parse_qs(parsed.query).get("url")
+            if target:
+                return target[0]
+        return url
     
     def _parse_search_results(self, result: Any, query: str) -> List[Dict[str, Any]]:
         """Parse browser-use output into structured articles."""
@@ -0,0 +1,155 @@
+"""Durable search quota ledger backed by SQLite."""
+
+import sqlite3
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+
+class QuotaLedger:
+    """Track searches against a daily budget that survives restarts.
+    
+    Every search reserves a slot before it runs, then commits it on success
+    or refunds it on failure. Reservations are written to SQLite before the
+    search starts, so a crash keeps its reservation and a crash loop can't
+    reset the budget. The window is either a sliding 24 hours or the
+    calendar day. Reads come from an in-memory index of the reservations
+    inside the window, so checking usage never touches the database.
+    """
+    
+    WINDOWS = ("calendar", "sliding")
+    
+    def __init__(
+        self,
+        db_path: str = "storage/scheduler.db",
+        limit: int = 50,
+        window: str = "calendar",
+        key: str = "search"
+    ):
+        if window not in self.WINDOWS:
+            raise ValueError(f"Unknown quota window: {window!r}")
+        self.db_path = db_path
+        self.limit = limit
+        self.window = window
+        self.key = key
+        # reservation id -> reserved_at, in reservation order
+        self._active: "OrderedDict[int, float]" = OrderedDict()
+        self._init_db()
+        self._load()
+    
+    def _init_db(self):
+        """Initialize the ledger table."""
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS quota_ledger (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    key TEXT NOT NULL,
+                    reserved_at REAL NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'reserved'
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_quota_ledger_key_time ON quota_ledger (key, reserved_at)"
+            )
+            # Nothing older than the longest window is ever needed again
+            conn.execute(
+                "DELETE FROM quota_ledger WHERE reserved_at < ?",
+                (time.time() - 2 * 86400,)
+            )
+            conn.commit()
+    
+    def _load(self):
+        """Index the reservations inside the current window."""
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT id, reserved_at FROM quota_ledger WHERE key = ? AND reserved_at >= ? ORDER BY id",
+                (self.key, self.window_start())
+            ).fetchall()
+        self._active = OrderedDict(rows)
+    
+    def window_start(self, now: Optional[float] = None) -> float:
+        """Epoch time at which the current window began."""
+        now = time.time() if now is None else now
+        if self.window == "sliding":
+            return now - 86400
+        return datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+    
+    def resets_at(self, now: Optional[float] = None) -> Optional[float]:
+        """Epoch time at which the next slot frees up, or None if nothing is used."""
+        now = time.time() if now is None else now
+        if self.window == "sliding":
+            self._expire(now)
+            return next(iter(self._active.values())) + 86400 if self._active else None
+        midnight = datetime.fromtimestamp(self.window_start(now)) + timedelta(days=1)
+        return midnight.timestamp()
+    
+    def used(self) -> int:
+        """Searches counted against the current window."""
+        self._expire(time.time())
+        return len(self._active)
+    
+    def remaining(self) -> int:
+        """Searches left in the current window."""
+        return max(self.limit - self.used(), 0)
+    
+    def reserve(self) -> Optional[int]:
+        """Reserve a search; returns the reservation id, or None if the budget is spent."""
+        now = time.time()
+        with sqlite3.connect(self.db_path, isolation_level=None) as conn:
+            # The write lock makes check-and-insert atomic across processes
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                (used,) = conn.execute(
+                    "SELECT COUNT(*) FROM quota_ledger WHERE key = ? AND reserved_at >= ?",
+                    (self.key, self.window_start(now))
+                ).fetchone()
+                if used >= self.limit:
+                    conn.execute("ROLLBACK")
+                    return None
+                cursor = conn.execute(
+                    "INSERT INTO quota_ledger (key, reserved_at) VALUES (?, ?)",
+                    (self.key, now)
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        self._active[cursor.lastrowid] = now
+        return cursor.lastrowid
+    
+    def commit(self, reservation_id: int):
+        """Mark a reserved search as done; it keeps counting against the budget."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                "UPDATE quota_ledger SET status = 'committed' WHERE id = ?",
+                (reservation_id,)
+            )
+            conn.commit()
+    
+    def refund(self, reservation_id: int):
+        """Give a failed search's reservation back to the budget."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM quota_ledger WHERE id = ?", (reservation_id,))
+            conn.commit()
+        self._active.pop(reservation_id, None)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return usage for the current window."""
+        used = self.used()
+        return {
+            "used": used,
+            "limit": self.limit,
+            "remaining": max(self.limit - used, 0),
+            "window": self.window,
+            "resets_at": self.resets_at()
+        }
+    
+    def _expire(self, now: float):
+        """Drop reservations that have left the window from the index."""
+        start = self.window_start(now)
+        while self._active and next(iter(self._active.values())) < start:
+            self._active.popitem(last=False)
@@ -0,0 +1,67 @@
+"""GCRA rate limiter with per-key buckets and burst allowances."""
+
+import statistics
+import time
+from collections import deque
+from typing import Optional, Dict, Any, Tuple
+
+
+class RateLimiter:
+    """Space out requests per key (search engine or domain) with GCRA.
+    
+    The generic cell rate algorithm is a token bucket kept as a single
+    timestamp per key: the theoretical arrival time (TAT) of the next
+    request. reserve() books the next free slot and returns how long the
+    caller has to wait for it, without holding a lock while waiting, so a
+    waiting search doesn't block anything else. Up to `burst` requests may
+    go back to back before spacing kicks in.
+    """
+    
+    def __init__(
+        self,
+        interval: float = 30.0,
+        burst: int = 1,
+        buckets: Optional[Dict[str, Dict[str, float]]] = None
+    ):
+        # key -> (seconds between requests, burst); keys not listed use the defaults
+        self.default = (float(interval), max(int(burst), 1))
+        self.buckets: Dict[str, Tuple[float, int]] = {
+            key: (float(limits.get("interval", interval)), max(int(limits.get("burst", burst)), 1))
+            for key, limits in (buckets or {}).items()
+        }
+        self._tat: Dict[str, float] = {}
+        self._waits: Dict[str, deque] = {}
+        self._reservations: Dict[str, int] = {}
+    
+    def delay(self, key: str = "default", now: Optional[float] = None) -> float:
+        """Seconds until a slot for key is free, without booking it."""
+        now = time.monotonic() if now is None else now
+        interval, burst = self.buckets.get(key, self.default)
+        tat = max(self._tat.get(key, now), now)
+        return max(tat - (burst - 1) * interval - now, 0.0)
+    
+    def reserve(self, key: str = "default", now: Optional[float] = None, waited: float = 0.0) -> float:
+        """Book the next slot for key and return the seconds to wait for it.
+        
+        waited is time the caller already spent waiting for this slot
+        elsewhere, so the wait metric covers it too.
+        """
+        now = time.monotonic() if now is None else now
+        interval, _ = self.buckets.get(key, self.default)
+        delay = self.delay(key, now)
+        self._tat[key] = max(self._tat.get(key, now), now) + interval
+        
+        self._reservations[key] = self._reservations.get(key, 0) + 1
+        self._waits.setdefault(key, deque(maxlen=200)).append(waited + delay)
+        return delay
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return reservation counts and wait times per key."""
+        return {
+            key: {
+                "reservations": self._reservations[key],
+                "p50_wait": statistics.median(waits),
+                "max_wait": max(waits)
+            }
+            for key, waits in self._waits.items()
+        }
@@ -1,25 +1,186 @@
 """Search tool wrapper for browser automation."""
 
+import asyncio
 import logging
-from typing import List, Dict, Any
-from .browser_pool import BrowserPool
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+from agent.json_store import load_json, save_json
+from .browser_pool import BrowserPool, normalize_query
 
 logger = logging.getLogger(__name__)
 
 
+class SearchResultCache:
+    """Persistent cache of search results keyed on the normalized query.
+    
+    An entry is fresh for its TTL and served as-is. After that it is stale
+    for another stale_ttl: served immediately while the caller revalidates
+    it in the background. Older entries are dropped. Every fresh hit is a
+    daily search that didn't have to be spent.
+    """
+    
+    SAVE_EVERY = 5  # writes between saves when persisting
+    
+    def __init__(
+        self,
+        ttl: float = 3600,
+        stale_ttl: float = 6 * 3600,
+        max_entries: int = 500,
+        persist_path: Optional[str] = None
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.persist_path = Path(persist_path) if persist_path else None
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._unsaved = 0
+        
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.quota_saved = 0
+        
+        if self.persist_path:
+            self.load()
+    
+    def get(self, query: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Return {"results", "stale"} for a cached query, or None."""
+        now = time.time() if now is None else now
+        key = normalize_query(query)
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = now - entry["stored_at"]
+            if age < entry.get("ttl", self.ttl):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.quota_saved += 1
+                return {"results": entry["results"], "stale": False}
+            if age < entry.get("ttl", self.ttl) + self.stale_ttl:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                return {"results": entry["results"], "stale": True}
+            del self._entries[key]
+        self.misses += 1
+        return None
+    
+    def put(self, query: str, results: List[Dict[str, Any]], ttl: Optional[float] = None):
+        """Cache a query's results, with an optional per-query TTL."""
+        if not results:
+            # An empty page is more likely a failed scrape than a real answer
+            return
+        key = normalize_query(query)
+        self._entries[key] = {
+            "results": results,
+            "ttl": self.ttl if ttl is None else ttl,
+            "stored_at": time.time()
+        }
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        
+        self._unsaved += 1
+        if self.persist_path and self._unsaved >= self.SAVE_EVERY:
+            self.save()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return size, hit/miss and quota-saved counters."""
+        total = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.stale_hits) / total if total else 0.0,
+            "quota_saved": self.quota_saved
+        }
+    
+    def load(self):
+        """Load entries that are still servable from the persistence file."""
+        entries = load_json(self.persist_path) or {}
+        now = time.time()
+        for key, entry in entries.items():
+            if now - entry.get("stored_at", 0) < entry.get("ttl", self.ttl) + self.stale_ttl:
+                self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def save(self):
+        """Write entries to the persistence file atomically."""
+        if not self.persist_path:
+            return
+        save_json(self.persist_path, self._entries)
+        self._unsaved = 0
+
+
 class SearchTool:
     """Tool for performing web searches."""
     
-    def __init__(self, browser_pool: BrowserPool):
+    def __init__(self, browser_pool: BrowserPool, cache: Optional[SearchResultCache] = None):
         self.browser_pool = browser_pool
+        self.cache = cache
+        self._revalidating: Dict[str, asyncio.Task] = {}
     
-    async def search(self, query: str) -> List[Dict[str, Any]]:
-        """Perform a Google search and return results."""
+    async def search(
+        self,
+        query: str,
+        use_cache: bool = True,
+        ttl: Optional[float] = None,
+        priority: str = "interactive",
+        user_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Perform a Google search and return results.
+        
+        Cached results are returned without spending a search; stale ones
+        are refreshed in the background. Pass use_cache=False to always
+        search (the fresh results still update the cache), and ttl to
+        override how long this query's results stay fresh. priority
+        ("interactive" or "scheduled") and user_id place the search in the
+        browser pool's queue.
+        """
+        if self.cache and use_cache:
+            cached = self.cache.get(query)
+            if cached is not None:
+                logger.info(f"Search cache {'stale hit' if cached['stale'] else 'hit'}: {query}")
+                if cached["stale"]:
+                    self._revalidate(query, ttl)
+                return cached["results"]
+        
         logger.info(f"Executing search: {query}")
         
         try:
-            results = await self.browser_pool.search(query)
-            return results
+            results = await self.browser_pool.search(query, priority=priority, user_id=user_id)
         except Exception as e:
             logger.error(f"Search failed: {e}")
             raise
+        if self.cache:
+            self.cache.put(query, results, ttl)
+        return results
+    
+    async def close(self):
+        """Cancel background revalidations and persist the cache."""
+        for task in list(self._revalidating.values()):
+            task.cancel()
+        await asyncio.gather(*self._revalidating.values(), return_exceptions=True)
+        if self.cache:
+            self.cache.save()
+    
+    def _revalidate(self, query: str, ttl: Optional[float]):
+        """Refresh a stale entry in the background, once per query."""
+        key = normalize_query(query)
+        if key in self._revalidating:
+            return
+        task = asyncio.create_task(self._refresh(query, ttl))
+        self._revalidating[key] = task
+        task.add_done_callback(lambda _: self._revalidating.pop(key, None))
+    
+    async def _refresh(self, query: str, ttl: Optional[float]):
+        try:
+            # Revalidation is background work
+            results = await self.browser_pool.search(query, priority="scheduled")
+        except Exception as e:
+            # Keep serving the stale entry until it ages out
+            logger.warning(f"Background refresh failed for '{query}': {e}")
+            return
+        self.cache.put(query, results, ttl)
@@ -0,0 +1,109 @@
+"""Priority queue with per-user fairness for browser searches."""
+
+import asyncio
+import itertools
+import statistics
+import time
+from collections import deque
+from typing import Optional, Dict, Any, List
+
+
+class SearchQueue:
+    """Order waiting searches by class, then fairly across users.
+    
+    Interactive searches go before scheduled ones, but a scheduled search
+    that has waited longer than `aging` seconds competes as interactive,
+    so a busy day can't starve background jobs. Within a class, users are
+    served by start-time fair queuing: each user's searches get increasing
+    virtual start tags (spaced by 1/weight), so one user queueing ten
+    searches doesn't delay another user's single one by ten slots.
+    """
+    
+    CLASSES = ("interactive", "scheduled")
+    
+    def __init__(self, aging: float = 120.0, user_weights: Optional[Dict[str, float]] = None):
+        self.aging = aging
+        self.user_weights = dict(user_weights or {})
+        self._entries: List[Dict[str, Any]] = []
+        self._seq = itertools.count()
+        self._virtual_time = 0.0
+        self._finish_tags: Dict[Optional[str], float] = {}
+        
+        self.waits: Dict[str, deque] = {name: deque(maxlen=200) for name in self.CLASSES}
+        self.served = {name: 0 for name in self.CLASSES}
+        self.aged = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def push(self, priority: str = "interactive", user_id: Optional[str] = None, **fields) -> Dict[str, Any]:
+        """Queue a search; the returned entry's "future" is resolved when it is served."""
+        if priority not in self.CLASSES:
+            raise ValueError(f"Unknown search priority: {priority!r}")
+        start = max(self._virtual_time, self._finish_tags.get(user_id, 0.0))
+        self._finish_tags[user_id] = start + 1.0 / self.user_weights.get(user_id, 1.0)
+        entry = {
+            **fields,
+            "priority": priority,
+            "user_id": user_id,
+            "future": asyncio.get_running_loop().create_future(),
+            "enqueued_at": time.monotonic(),
+            "start_tag": start,
+            "seq": next(self._seq)
+        }
+        self._entries.append(entry)
+        return entry
+    
+    def peek(self, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Return the entry to serve next, dropping ones whose caller gave up."""
+        self._entries = [e for e in self._entries if not e["future"].done()]
+        if not self._entries:
+            return None
+        now = time.monotonic() if now is None else now
+        # A handful of waiters at most, and aging changes ranks over time, so scan
+        return min(self._entries, key=lambda e: (self._rank(e, now), e["start_tag"], e["seq"]))
+    
+    def promote(self, entry: Dict[str, Any], priority: str = "interactive"):
+        """Move a still-waiting entry to a more urgent class, keeping its start tag."""
+        if priority not in self.CLASSES:
+            raise ValueError(f"Unknown search priority: {priority!r}")
+        if any(e is entry for e in self._entries):
+            entry["priority"] = priority
+    
+    def remove(self, entry: Dict[str, Any], now: Optional[float] = None):
+        """Take a served entry off the queue and record its wait."""
+        now = time.monotonic() if now is None else now
+        self._entries.remove(entry)
+        self._virtual_time = max(self._virtual_time, entry["start_tag"])
+        priority = entry["priority"]
+        if priority == "scheduled" and self._rank(entry, now) == 0:
+            self.aged += 1
+        self.served[priority] += 1
+        self.waits[priority].append(now - entry["enqueued_at"])
+    
+    def clear(self):
+        """Cancel every waiting search."""
+        for entry in self._entries:
+            entry["future"].cancel()
+        self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth and wait times per class."""
+        stats: Dict[str, Any] = {
+            name: {
+                "depth": sum(
+                    1 for e in self._entries if e["priority"] == name and not e["future"].done()
+                ),
+                "served": self.served[name],
+                "p50_wait": statistics.median(self.waits[name]) if self.waits[name] else None,
+                "max_wait": max(self.waits[name]) if self.waits[name] else None
+            }
+            for name in self.CLASSES
+        }
+        stats["aged"] = self.aged
+        return stats
+    
+    def _rank(self, entry: Dict[str, Any], now: float) -> int:
+        if entry["priority"] == "interactive" or now - entry["enqueued_at"] >= self.aging:
+            return 0
+        return 1
@@ -0,0 +1,221 @@
+"""Worker processes that run browser searches outside the daemon.
+
+BrowserPool starts one worker per slot when worker_processes is on. The
+parent writes one JSON request per line to a worker's stdin and reads
+JSON replies from its stdout:
+    
+    -> {"id": 1, "op": "search", "query": "..."}
+    <- {"id": 1, "event": "article", "article": {...}}  (one per result, as found)
+    <- {"id": 1, "event": "done", "path": "serp", "seconds": 2.1, "google_requests": 1, "llm": {...}}
+    <- {"id": 1, "event": "error", "error": "..."}
+
+A "ping" request gets a "pong". A worker sends {"event": "ready"} once
+its browser is up and exits when its stdin is closed.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class SearchTimeout(Exception):
+    """A search ran past its wall-clock limit and its worker was killed.
+    
+    articles holds whatever results the worker sent before that.
+    """
+    
+    def __init__(self, message: str, articles: Optional[List[Dict[str, Any]]] = None):
+        super().__init__(message)
+        self.articles = articles or []
+
+
+class SearchWorker:
+    """Parent-side handle on one worker process.
+    
+    It has the start()/kill() lifecycle of a browser session, so BrowserPool
+    launches, recycles and reaps workers like browsers. A search that
+    runs past its timeout kills the whole worker process group (the
+    worker and its Chromium), since a hung browser can't be trusted to
+    answer a cancel.
+    """
+    
+    def __init__(self, config: Dict[str, Any], grace: float = 5.0):
+        self.config = config
+        # Seconds a worker gets to shut its browser down before it is killed
+        self.grace = grace
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self._ids = itertools.count(1)
+        # One request at a time; replies are read in order
+        self._lock = asyncio.Lock()
+    
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process.pid if self.process else None
+    
+    async def start(self):
+        """Start the worker and wait until its browser is ready."""
+        self.process = await asyncio.create_subprocess_exec(
+            # Not "-m": the tools package has already imported this module by then
+            sys.executable, "-c", "from tools.search_worker import main; main()", json.dumps(self.config),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            cwd=str(ROOT),
+            # Its own process group, so a kill takes Chromium down with it
+            start_new_session=True,
+            limit=2**20
+        )
+        message = await self._read()
+        if message.get("event") != "ready":
+            raise Exception(f"Search worker sent {message!r} instead of ready")
+    
+    async def search(self, query: str, timeout: float) -> Dict[str, Any]:
+        """Run a search; returns the articles plus the worker's path, time and LLM usage."""
+        async with self._lock:
+            if self.process is None:
+                await self.start()
+            request_id = next(self._ids)
+            self._send({"id": request_id, "op": "search", "query": query})
+            # Articles stream in as the worker finds them, so a search that
+            # hangs afterwards (e.g. closing a wedged page) keeps its results
+            articles: List[Dict[str, Any]] = []
+            try:
+                reply = await asyncio.wait_for(self._collect(request_id, articles), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Search worker {self.pid} exceeded {timeout:.0f}s on '{query}', killing it")
+                await self._terminate()
+                raise SearchTimeout(f"Search timed out after {timeout:.0f}s", articles)
+            return {**reply, "articles": articles}
+    
+    async def ping(self):
+        """Round-trip a message through the worker."""
+        async with self._lock:
+            request_id = next(self._ids)
+            self._send({"id": request_id, "op": "ping"})
+            while True:
+                message = await self._read()
+                if message.get("id") == request_id:
+                    return
+    
+    async def kill(self):
+        """Ask the worker to exit, killing its process group if it doesn't in time."""
+        if self.process is None or self.process.returncode is not None:
+            return
+        self.process.stdin.close()
+        try:
+            await asyncio.wait_for(self.process.wait(), timeout=self.grace)
+        except asyncio.TimeoutError:
+            await self._terminate()
+    
+    async def _collect(self, request_id: int, articles: List[Dict[str, Any]]) -> Dict[str, Any]:
+        while True:
+            message = await self._read()
+            # Skip leftovers, e.g. a "ready" nobody waited for
+            if message.get("id") != request_id:
+                continue
+            if message["event"] == "article":
+                articles.append(message["article"])
+            elif message["event"] == "error":
+                raise Exception(message["error"])
+            else:
+                return message
+    
+    def _send(self, message: Dict[str, Any]):
+        self.process.stdin.write((json.dumps(message) + "\n").encode())
+    
+    async def _read(self) -> Dict[str, Any]:
+        line = await self.process.stdout.readline()
+        if not line:
+            code = await self.process.wait()
+            raise Exception(f"Search worker exited with code {code}")
+        return json.loads(line)
+    
+    async def _terminate(self):
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except OSError:
+            pass
+        await self.process.wait()
+
+
+async def serve(config: Dict[str, Any]):
+    """Worker main loop: one single-browser BrowserPool answering requests from stdin."""
+    # Replies get the real stdout; anything else printing to it goes to stderr
+    replies = os.fdopen(os.dup(1), "w", buffering=1)
+    os.dup2(2, 1)
+    
+    def send(message: Dict[str, Any]):
+        replies.write(json.dumps(message) + "\n")
+    
+    from agent.ollama_pool import OllamaEndpointPool
+    from tools.browser_pool import BrowserPool
+    
+    ollama_pool = OllamaEndpointPool(config.pop("ollama_urls"))
+    # The parent does rate limiting, quota, health checks and recycling
+    pool = BrowserPool(
+        max_instances=1,
+        min_instances=1,
+        rate_limit_delay=0,
+        health_interval=0,
+        recycle_after=0,
+        max_rss_mb=None,
+        ollama_pool=ollama_pool,
+        **config
+    )
+    await pool.initialize()
+    
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=2**20)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    send({"event": "ready"})
+    try:
+        while line := await reader.readline():
+            request = json.loads(line)
+            if request["op"] == "ping":
+                send({"id": request["id"], "event": "pong"})
+                continue
+            
+            fallbacks = pool.serp_fallbacks
+            google = pool.rate_limiter.stats().get("google", {}).get("reservations", 0)
+            llm = pool.llm.stats()
+            started = time.monotonic()
+            try:
+                await pool.run_search(
+                    request["query"],
+                    on_article=lambda article: send({"id": request["id"], "event": "article", "article": article})
+                )
+            except Exception as e:
+                send({"id": request["id"], "event": "error", "error": str(e)})
+                continue
+            usage = pool.llm.stats()
+            send({
+                "id": request["id"],
+                "event": "done",
+                "path": "serp" if pool.direct_serp and pool.serp_fallbacks == fallbacks else "agent",
+                "seconds": time.monotonic() - started,
+                "google_requests": pool.rate_limiter.stats()["google"]["reservations"] - google,
+                "llm": {key: usage[key] - llm[key] for key in usage}
+            })
+    finally:
+        await pool.cleanup()
+        await ollama_pool.close()
+
+
+def main():
+    """Entry point of a worker process; its config is the JSON in argv[1]."""
+    logging.basicConfig(
+        level=logging.INFO,
+        stream=sys.stderr,
+        format=f"%(asctime)s - search worker {os.getpid()} - %(name)s - %(levelname)s - %(message)s"
+    )
+    asyncio.run(serve(json.loads(sys.argv[1])))